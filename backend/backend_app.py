@@ -13,6 +13,9 @@
 # 10- Aesthetic blog design and layout achieved through CSS and JavaScript code modifications
 # 11- Robust error handling.
 # 12- Utilization of both custom-defined and standard dialog boxes.
+# 13- Filtering of posts and search results by date range and author.
+# 14- Live change feed (Server-Sent Events) of created, updated, deleted and liked posts.
+# 15- Fast startup with lazily loaded posts, and a health check reporting startup metrics.
 
 """
 backend_app.py
@@ -34,25 +37,37 @@ Global Constants:
 
 Functions:
 - check_for_headers: Function to check for required headers and validate Content-Type.
+- get_filter_args: Function to parse the date-range and author filters of a request.
 - like_post: Function to increase the like count for a blog post identified by its ID.
 - edit_post: Function to handle 'PUT' and 'DELETE' requests to edit an existing blog post
     identified by its ID.
 - handle_search: Function to handle search requests for blog posts based on specified parameters.
 - handle_posts: Function to handle requests for retrieving all blog posts or creating a new post.
+- stream_post_events: Function to stream post change events to a client as Server-Sent Events.
+- seconds_since_process_start: Function to measure the time elapsed since the process start.
+- record_first_request: Function to record the time it took to serve the first request.
+- reject_until_posts_ready: Function to answer 503 while a lazy load is still building the
+    posts snapshot.
+- health_check: Function to report the health and the startup metrics of the application.
 
 Endpoints:
 - /api/posts/<int:post_id> (PUT, DELETE): Edit a blog post identified by its ID.
 - /api/like/<int:post_id> (POST): Like a blog post identified by its ID.
 - /api/posts/search (GET): Handle search requests for blog posts based on specified parameters.
 - /api/posts (GET, POST): Handle requests for retrieving all blog posts or creating a new post.
+  Both GET endpoints accept the 'from' and 'to' (YYYY-MM-DD, inclusive) and 'author' filters.
+- /api/posts/events (GET): Stream post change events (Server-Sent Events).
+- /api/health (GET): Report the health and the startup metrics of the application.
 
 To run the application, execute this module. The application will run on http://0.0.0.0:5002/.
 """
 
 import json
+import os
+import time
 from datetime import datetime
 
-from flask import (Flask, jsonify, request)
+from flask import (Flask, Response, jsonify, request)
 
 from flask_cors import CORS
 from flask_limiter import Limiter
@@ -60,7 +75,10 @@ from flask_limiter.util import get_remote_address
 from werkzeug.exceptions import BadRequest
 
 from database.data_handler import (DataHandler, PostNotFoundError,
-                                   UpdatePostError, NoValidDataError)
+                                   UpdatePostError, NoValidDataError, server_sent_events)
+
+# Fallback reference of seconds_since_process_start() where /proc is not available
+module_loaded = time.perf_counter()
 
 # Initialize our web application instance
 app = Flask(__name__)
@@ -72,7 +90,42 @@ CORS(app)
 limiter = Limiter(app=app, key_func=get_remote_address)
 
 
-posts_storage = DataHandler("blog_posts.json")
+def seconds_since_process_start():
+    """
+    Return the number of seconds elapsed since the process was started.
+
+    The start time of the process is read from /proc (with a resolution of a clock tick),
+    so the interpreter startup and the imports are included. Where /proc is not available,
+    the time is counted from the loading of this module instead.
+
+    :return: (float) The number of seconds since the process start.
+    """
+    try:
+        with open('/proc/self/stat', encoding='utf-8') as file:
+            # The command name may contain spaces, so the fields are split after its ')'
+            fields = file.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime', encoding='utf-8') as file:
+            uptime = float(file.read().split()[0])
+        # 'starttime', the 22nd field, counts the clock ticks from the boot to the start
+        return uptime - int(fields[19]) / os.sysconf('SC_CLK_TCK')
+    except (OSError, IndexError, ValueError):
+        return time.perf_counter() - module_loaded
+
+
+# Set MASTERBLOG_SHARED_SNAPSHOT=1 when running several worker processes, so they all
+# read the posts from one shared memory-mapped snapshot instead of a copy each
+# Set MASTERBLOG_LAZY_LOAD=1 to start serving right away and load the posts in the
+# background, which keeps the startup short for large post stores
+posts_storage = DataHandler("blog_posts.json",
+                            shared_snapshot=os.environ.get('MASTERBLOG_SHARED_SNAPSHOT') == '1',
+                            lazy_load=os.environ.get('MASTERBLOG_LAZY_LOAD') == '1')
+
+# Startup metrics reported by the health check
+startup_metrics = {
+    'startupSeconds': round(seconds_since_process_start(), 3),
+    'postsLoadSeconds': round(posts_storage.load_seconds, 3),
+    'timeToFirstRequestSeconds': None
+}
 
 # Define the supported media types
 supported_media_types = ['application/json', 'application/xml']
@@ -86,6 +139,9 @@ allowed_direction_values = ['asc', 'desc']
 # Define the allowed direction values
 allowed_page_size_values = [10, 20, 50, 100]
 
+# Define the format of the 'from' and 'to' date filters
+filter_date_format = '%Y-%m-%d'
+
 
 def check_for_headers():
     """
@@ -142,6 +198,87 @@ def check_for_headers():
     return exception_in_first_block, response, data
 
 
+@app.before_request
+def record_first_request():
+    """
+    Record the time it took to serve the first request, counted from the process start.
+    """
+    if startup_metrics['timeToFirstRequestSeconds'] is None:
+        startup_metrics['timeToFirstRequestSeconds'] = round(seconds_since_process_start(), 3)
+        print(f"Time to first request: {startup_metrics['timeToFirstRequestSeconds']}s")
+
+
+@app.before_request
+def reject_until_posts_ready():
+    """
+    Answer 503 Service Unavailable while a lazy load is still building the posts snapshot.
+
+    Only the health check (and the CORS preflight requests) are answered meanwhile.
+    """
+    if (not posts_storage.ready.is_set() and request.endpoint != 'health_check'
+            and request.method != 'OPTIONS'):
+        return (jsonify({'error': 'Service Unavailable: the posts are still loading'}), 503,
+                {'Retry-After': '1'})
+
+
+@app.route('/api/health', methods=['GET'])
+@limiter.exempt
+def health_check():
+    """
+    Report the health and the startup metrics of the application.
+
+    The health check never waits for the posts to be loaded or hydrated, so it answers
+    as soon as the server is up, even while a lazy load is still in progress.
+
+    Returns:
+        JSON: A JSON response with the status, the loading and hydration states and the
+        startup metrics.
+    """
+    hydration_seconds = posts_storage.hydration_seconds
+    ready = posts_storage.ready.is_set()
+    return jsonify({
+        'status': 'ok',
+        'totalPosts': posts_storage.count() if ready else None,
+        'ready': ready,
+        'hydrated': posts_storage.hydrated.is_set(),
+        'metrics': {
+            **startup_metrics,
+            'hydrationSeconds': (round(hydration_seconds, 3)
+                                 if hydration_seconds is not None else None)
+        }
+    })
+
+
+def get_filter_args():
+    """
+    Parse the date-range and author filters from the query string.
+
+    The 'from' and 'to' parameters are dates in the YYYY-MM-DD format and both days are
+    included in the range. The 'author' parameter matches the author name exactly,
+    ignoring case.
+
+    :return: A tuple (filters, response)
+             - filters: A dictionary with the 'date_from', 'date_to' and 'author' filters.
+             - response: Flask response object with an error message and status code if a
+               filter is invalid, otherwise None.
+    """
+    filters = {'author': request.args.get('author', default='', type=str)}
+
+    for arg_name, filter_name in (('from', 'date_from'), ('to', 'date_to')):
+        value = request.args.get(arg_name, default='', type=str)
+        filters[filter_name] = None
+        if value:
+            try:
+                filters[filter_name] = datetime.strptime(value, filter_date_format).date()
+            except ValueError:
+                return None, (jsonify({'error': f'Bad Request: Invalid {arg_name} value'}), 400)
+
+    if (filters['date_from'] and filters['date_to']
+            and filters['date_from'] > filters['date_to']):
+        return None, (jsonify({'error': 'Bad Request: from date is after to date'}), 400)
+    return filters, None
+
+
 @app.route('/api/posts/<int:post_id>', methods=['PUT', 'DELETE'])
 @limiter.limit("20 per minute")
 def edit_post(post_id):
@@ -263,13 +400,19 @@ def handle_search():
     if page_size and page_size not in allowed_page_size_values:
         return jsonify({'error': 'Bad Request: Invalid pageSize value'}), 400
 
+    # Get the date-range and author filters from the query string
+    filters, error_response = get_filter_args()
+    if error_response:
+        return error_response
+
     request_args = {
         'search_for': request.args.get('search_for', default='', type=str),
         'search_by': search_by,
         'sort_by': sort_by,
         'direction': direction,
         'page': int(request.args.get('page', 1)),
-        'page_size': page_size
+        'page_size': page_size,
+        **filters
     }
     return jsonify(posts_storage.search_posts(request_args))
 
@@ -310,10 +453,9 @@ def handle_posts():
         today = datetime.today()
         date = today.strftime("%a, %b %d, %Y")
         sort_date = today.strftime('%a, %b %d, %Y %H:%M:%S')
-        unique_id = posts_storage.request_unique_id()
 
         new_post = {
-            'id': unique_id,
+            'id': None,  # assigned by save_post()
             'date': date,
             'author': author,
             'title': title,
@@ -340,7 +482,41 @@ def handle_posts():
     page = int(request.args.get('page', 1))
     page_size = int(request.args.get('pageSize', 10))
 
-    return jsonify(posts_storage.get_posts(sort_by, direction, page, page_size))
+    # Get the date-range and author filters from the query string
+    filters, error_response = get_filter_args()
+    if error_response:
+        return error_response
+
+    return jsonify(posts_storage.get_posts(sort_by, direction, page, page_size, filters))
+
+
+@app.route('/api/posts/events', methods=['GET'])
+@limiter.exempt
+def stream_post_events():
+    """
+    Stream post change events to the client as Server-Sent Events.
+
+    Each event is named after its type ('created', 'updated', 'deleted', 'liked' or
+    'resync') and carries a compact JSON payload with the post id and the changed
+    fields. A comment line is sent while idle to keep the connection open.
+
+    In shared snapshot mode the events of the changes handled by the other worker
+    processes are relayed as well. The stream holds a thread for as long as the client
+    stays connected, so the server must run threaded (or asynchronous) workers.
+
+    Returns:
+        Response: A 'text/event-stream' response that stays open until the client leaves.
+    """
+    subscriber = posts_storage.subscribe()
+
+    def generate():
+        try:
+            yield from server_sent_events(subscriber)
+        finally:
+            posts_storage.unsubscribe(subscriber)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 if __name__ == '__main__':
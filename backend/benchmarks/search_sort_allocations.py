@@ -0,0 +1,220 @@
+"""
+search_sort_allocations.py
+This benchmark compares the memory allocated by a single search or sort query before and
+after the normalized post fields were introduced.
+
+The 'legacy' variants replay the previous implementation, which lowered every candidate
+field and parsed every 'sort_date' on each request. The 'table' variants query the
+PostTable of the JSON mode, which reuses the fields normalized when the posts were
+loaded, and the 'snapshot' variants query the columns of the shared posts snapshot.
+
+tracemalloc only reports the memory in use and its peak, which misses the temporaries
+freed along the way (e.g. the lowered copy of every searched field). The benchmark
+therefore reports the total number of bytes allocated by a query, see allocated_bytes().
+
+Run it from the 'backend' directory:
+    python -m benchmarks.search_sort_allocations [number_of_posts]
+"""
+
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from itertools import repeat
+
+from database.data_handler import PostTable, sort_if_necessary
+from database.normalization import SORT_DATE_FORMAT
+from database.snapshot import PostSnapshot, write_snapshot
+
+QUERIES = 20
+PAGE_SIZE = 10
+
+
+def generate_posts(count):
+    """
+    Generates random blog posts.
+
+    :param count: (int) The number of posts to generate.
+
+    :return: (list) The generated blog posts.
+    """
+    rng = random.Random(42)
+    start = datetime(2023, 1, 1)
+
+    def words(number):
+        return ' '.join(''.join(rng.choices(string.ascii_letters, k=rng.randint(3, 9)))
+                        for _ in range(number))
+
+    posts = []
+    for post_id in range(1, count + 1):
+        created = start + timedelta(minutes=rng.randint(0, 500_000))
+        posts.append({'id': post_id,
+                      'date': created.strftime("%a, %b %d, %Y"),
+                      'author': words(2),
+                      'title': words(5),
+                      'content': words(60),
+                      'sort_date': created.strftime(SORT_DATE_FORMAT)})
+    return posts
+
+
+def legacy_search(posts, search_for, post_key):
+    """
+    Replays the previous search: every candidate field is lowered on each query.
+    """
+    search_for = search_for.lower()
+    return [post for post in posts if search_for in post[post_key].lower()]
+
+
+def search_page(search, posts, search_for, post_key):
+    """
+    Runs a search and returns its first page and its number of matches, like search_posts().
+
+    :param search: (callable) The search function, taking the arguments below.
+    :param posts: (list | PostTable | PostSnapshot) The blog posts to search.
+    :param search_for: (str) The text to look for.
+    :param post_key: (str) The field to search in.
+
+    :return: (tuple) The first page of matching posts and the number of matches.
+    """
+    matches = search(posts, search_for, post_key)
+    return [posts[match] if isinstance(match, int) else match
+            for match in matches[:PAGE_SIZE]], len(matches)
+
+
+def normalized_search(posts, search_for, post_key):
+    """
+    Searches the normalized fields of a PostTable or a PostSnapshot.
+    """
+    return posts.search(post_key, search_for)
+
+
+def legacy_sort(posts, sort_by, start_index, end_index):
+    """
+    Replays the previous sort_if_necessary(): every sort key is rebuilt on each query.
+    """
+    if sort_by == 'date':
+        sorted_posts = sorted(posts, key=lambda post: datetime.strptime(post['sort_date'],
+                                                                        SORT_DATE_FORMAT))
+    else:
+        sorted_posts = sorted(posts, key=lambda post: (post[sort_by][0].lower(),
+                                                       post[sort_by]))
+    return sorted_posts[start_index:end_index]
+
+
+def allocated_bytes(query):
+    """
+    Measures the total number of bytes allocated by one run of a query.
+
+    A profile hook splits the query at every Python and C function call and return, and
+    sums how far the traced memory grew within each of these intervals. The bytes the
+    hook allocates itself are measured on calls that allocate nothing, and subtracted.
+
+    :param query: (callable) The query to run.
+
+    :return: (tuple) The number of bytes allocated, and the number of hook events.
+    """
+    growth = events = start = 0
+
+    def hook(frame, event, arg):
+        nonlocal growth, events, start
+        current, peak = tracemalloc.get_traced_memory()
+        growth += peak - start
+        events += 1
+        tracemalloc.reset_peak()
+        start = current
+
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    sys.setprofile(hook)
+    try:
+        query()
+    finally:
+        sys.setprofile(None)
+        tracemalloc.stop()
+    return growth, events
+
+
+def hook_overhead():
+    """
+    Measures the bytes counted by allocated_bytes() for each event, on calls that allocate
+    nothing.
+
+    :return: (float) The bytes counted per hook event.
+    """
+    def idle():
+        for _ in repeat(None, 10_000):
+            len(())
+
+    growth, events = allocated_bytes(idle)
+    return growth / events
+
+
+def measure(query, overhead):
+    """
+    Runs a query and measures its allocations and mean duration.
+
+    :param query: (callable) The query to run.
+    :param overhead: (float) The bytes counted per hook event, see hook_overhead().
+
+    :return: (tuple) The KiB allocated by one query and its mean duration in ms.
+    """
+    query()  # warm up
+    growth, events = allocated_bytes(query)
+
+    started = time.perf_counter()
+    for _ in range(QUERIES):
+        query()
+    elapsed = (time.perf_counter() - started) / QUERIES
+    return max(growth - events * overhead, 0) / 1024, elapsed * 1000
+
+
+def main():
+    """
+    Runs the benchmark and prints one line per query type.
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    posts = generate_posts(count)
+    table = PostTable(posts)
+
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = os.path.join(directory, 'bench_posts.snapshot')
+        write_snapshot(snapshot_path, posts, 1)
+        snapshot = PostSnapshot(snapshot_path)
+
+        cases = []
+        for field in ('content', 'title'):
+            cases.append((f'search {field}',
+                          lambda field=field: search_page(legacy_search, posts, 'ab', field),
+                          lambda field=field: search_page(normalized_search, table, 'ab',
+                                                          field),
+                          lambda field=field: search_page(normalized_search, snapshot, 'ab',
+                                                          field)))
+        for field in ('title', 'date'):
+            cases.append((f'sort by {field}',
+                          lambda field=field: legacy_sort(posts, field, 0, PAGE_SIZE),
+                          lambda field=field: sort_if_necessary(field, 'asc', table, None,
+                                                                0, PAGE_SIZE),
+                          lambda field=field: sort_if_necessary(field, 'asc', snapshot, None,
+                                                                0, PAGE_SIZE)))
+
+        overhead = hook_overhead()
+        print(f"{count} posts, KiB allocated by one query and its mean duration "
+              f"(returning the first page of {PAGE_SIZE} posts)\n")
+        print(f"{'query':<16}{'legacy KiB':>12}{'table KiB':>11}{'snapshot KiB':>14}"
+              f"{'legacy ms':>11}{'table ms':>10}{'snapshot ms':>13}")
+        for name, legacy, normalized, shared in cases:
+            # The three variants must agree before they are compared
+            assert legacy() == normalized() == shared(), name
+            legacy_kib, legacy_ms = measure(legacy, overhead)
+            table_kib, table_ms = measure(normalized, overhead)
+            snapshot_kib, snapshot_ms = measure(shared, overhead)
+            print(f"{name:<16}{legacy_kib:>12.1f}{table_kib:>11.1f}{snapshot_kib:>14.1f}"
+                  f"{legacy_ms:>11.2f}{table_ms:>10.2f}{snapshot_ms:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
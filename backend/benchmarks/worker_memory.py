@@ -0,0 +1,141 @@
+"""
+worker_memory.py
+This benchmark compares the memory used by every worker process, and the duration of a
+sort and a search query, when the posts are loaded from the JSON database by every
+worker or served from the shared posts snapshot.
+
+Every worker is started as a fresh interpreter, loads the posts, runs the queries and
+then reports its memory from /proc/self/smaps_rollup while all the workers are alive:
+- RSS: the resident memory of the worker, shared pages included.
+- PSS: the resident memory, with every shared page split between the processes using it.
+- USS: the memory private to the worker, i.e. what one more worker costs.
+
+Run it from the 'backend' directory (Linux only):
+    python -m benchmarks.worker_memory [number_of_posts] [number_of_workers]
+"""
+
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.search_sort_allocations import generate_posts
+from database.data_handler import DataHandler
+
+MODES = ('json', 'shared')
+QUERIES = 5
+
+
+def measure(query):
+    """
+    Runs a query repeatedly and measures its mean CPU time, which unlike the elapsed time
+    does not depend on how many workers share the CPUs.
+
+    :param query: (callable) The query to run.
+
+    :return: (float) The mean CPU time of the query in ms.
+    """
+    started = time.process_time()
+    for _ in range(QUERIES):
+        query()
+    return (time.process_time() - started) / QUERIES * 1000
+
+
+def read_memory():
+    """
+    Reads the memory of the current process.
+
+    :return: (dict) The RSS, PSS and USS of the process, in MiB.
+    """
+    fields = {}
+    with open('/proc/self/smaps_rollup', encoding='utf-8') as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {'rss': fields['Rss'], 'pss': fields['Pss'],
+            'uss': fields['Private_Clean'] + fields['Private_Dirty']}
+
+
+def worker(database_path, mode, barrier, results):
+    """
+    Loads the posts like a worker process of the API, runs the queries, and reports.
+
+    :param database_path: (str) The absolute path of the JSON database file.
+    :param mode: (str) One of MODES.
+    :param barrier: (multiprocessing.Barrier) Holds the workers until all of them are loaded.
+    :param results: (multiprocessing.Queue) The queue receiving the report of the worker.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        # An absolute file name makes the DataHandler ignore the working directory
+        handler = DataHandler(database_path, shared_snapshot=mode == 'shared')
+
+    # Query once all the workers are loaded, so they don't compete with the loading ones
+    barrier.wait()
+    sort_ms = measure(lambda: handler.get_posts('title', 'asc', 1, 10))
+    search_ms = measure(lambda: handler.search_posts({'search_for': 'ab',
+                                                      'search_by': 'content'}))
+
+    barrier.wait()
+    report = read_memory()
+    report.update(load_s=handler.load_seconds, sort_ms=sort_ms, search_ms=search_ms)
+    results.put(report)
+    # Stay alive until every worker has measured its share of the mapping
+    barrier.wait()
+
+
+def run_workers(database_path, mode, workers):
+    """
+    Starts the workers of one mode and averages their reports.
+
+    :param database_path: (str) The absolute path of the JSON database file.
+    :param mode: (str) One of MODES.
+    :param workers: (int) The number of worker processes.
+
+    :return: (dict) The mean report of the workers.
+    """
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(database_path, mode, barrier, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return {key: sum(report[key] for report in reports) / workers for key in reports[0]}
+
+
+def main():
+    """
+    Runs the benchmark and prints one line per mode.
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = os.path.join(directory, 'bench_posts.json')
+        with open(database_path, 'w', encoding='utf-8') as file:
+            json.dump(generate_posts(count), file)
+
+        # Publish the snapshot once, as the first worker of a deployment would
+        with contextlib.redirect_stdout(io.StringIO()):
+            DataHandler(database_path, shared_snapshot=True)
+
+        print(f"{count} posts, {workers} workers, mean per worker\n")
+        print(f"{'mode':<8}{'RSS MiB':>10}{'PSS MiB':>10}{'USS MiB':>10}"
+              f"{'load s':>9}{'sort ms':>10}{'search ms':>11}")
+        for mode in MODES:
+            report = run_workers(database_path, mode, workers)
+            print(f"{mode:<8}{report['rss']:>10.1f}{report['pss']:>10.1f}{report['uss']:>10.1f}"
+                  f"{report['load_s']:>9.3f}{report['sort_ms']:>10.2f}"
+                  f"{report['search_ms']:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
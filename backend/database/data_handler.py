@@ -1,7 +1,28 @@
 import json
 import sys
 import os
-from datetime import datetime
+import queue
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import timedelta
+
+from database.normalization import (NORMALIZED_FIELDS, SORTABLE_TEXT_FIELDS, day_timestamp,
+                                    normalization_key, normalize_text, sort_initial,
+                                    sort_timestamp)
+from database.snapshot import (INDEXED_FIELDS, PostSnapshot, SnapshotError, SnapshotWriteLock,
+                               encode_post, patch_snapshot, write_snapshot)
+
+# The position of the normalized author in PostShadow.search
+AUTHOR_FIELD = NORMALIZED_FIELDS.index('author')
+
+# How many times hydrating the posts is attempted before giving up
+HYDRATION_ATTEMPTS = 3
+
+# How often, in seconds, a worker checks the shared snapshot for changes of other workers
+SNAPSHOT_POLL_SECONDS = 0.5
 
 
 class UpdatePostError(Exception):
@@ -28,6 +49,385 @@ class PostNotFoundError(UpdatePostError):
         super().__init__(self.message)
 
 
+class PostShadow:
+    """
+    The normalized values of a blog post, computed once and reused by every query.
+
+    The shadow is never part of the API output; it only replaces the per-request
+    '.lower()' and 'strptime' calls of searching and sorting.
+
+    Attributes:
+    - search (tuple): The normalized text of each field of NORMALIZED_FIELDS.
+    - initials (tuple): The lowered first letter of each field of SORTABLE_TEXT_FIELDS.
+    - sort_date (int): The 'sort_date' of the post as a timestamp.
+    """
+
+    __slots__ = ('search', 'initials', 'sort_date')
+
+    def __init__(self, post, fold_accents=False):
+        """
+        Initializes the PostShadow instance.
+
+        :param post: (dict) The blog post to normalize.
+        :param fold_accents: (bool) Whether to strip accents from the searchable fields.
+        """
+        self.search = tuple(normalize_text(post[field], fold_accents)
+                            for field in NORMALIZED_FIELDS)
+        self.initials = tuple(sort_initial(post[field]) for field in SORTABLE_TEXT_FIELDS)
+        self.sort_date = sort_timestamp(post['sort_date'])
+
+
+class PostIndexes:
+    """
+    Indexes answering the date-range and author filters without scanning every post.
+
+    Attributes:
+    - _dates (list): The 'sort_date' timestamp of every blog post, in ascending order.
+    - _date_order (list): The positions of the blog posts, in the same order as '_dates'.
+    - _authors (dict): The positions of the blog posts of every author, keyed by
+        normalized author.
+    """
+
+    __slots__ = ('_dates', '_date_order', '_authors')
+
+    def __init__(self, shadows):
+        """
+        Initializes the PostIndexes instance.
+
+        :param shadows: (list) The PostShadow of every blog post, in the stored order.
+        """
+        self._date_order = sorted(range(len(shadows)),
+                                  key=lambda position: shadows[position].sort_date)
+        self._dates = [shadows[position].sort_date for position in self._date_order]
+
+        self._authors = {}
+        for position, shadow in enumerate(shadows):
+            self._authors.setdefault(shadow.search[AUTHOR_FIELD], []).append(position)
+
+    def positions_between(self, date_from=None, date_to=None):
+        """
+        Returns the positions of the blog posts created within a date range.
+
+        :param date_from: (date) The first day of the range, or None for no lower bound.
+        :param date_to: (date) The last day of the range (inclusive), or None for no upper bound.
+
+        :return: (list) The positions of the matching blog posts.
+        """
+        start = 0
+        end = len(self._dates)
+        if date_from is not None:
+            start = bisect_left(self._dates, day_timestamp(date_from))
+        if date_to is not None:
+            end = bisect_left(self._dates, day_timestamp(date_to + timedelta(days=1)))
+        return self._date_order[start:end]
+
+    def positions_by_author(self, author):
+        """
+        Returns the positions of the blog posts of an author, ignoring case.
+
+        :param author: (str) The normalized author name.
+
+        :return: (list) The positions of the matching blog posts.
+        """
+        return self._authors.get(author, [])
+
+
+class PostTable:
+    """
+    The blog posts loaded from the JSON database, with the normalized values of each post.
+
+    The table answers the queries of the DataHandler by post position, the same way the
+    shared PostSnapshot does. It is built again whenever the posts have been reloaded or
+    written; the shadows of the unchanged posts are reused then.
+
+    Attributes:
+    - posts (list): The blog posts, in their stored order.
+    - revision (int): The write revision of the posts the table was built from.
+    - _shadows (list): The PostShadow of every blog post, aligned with 'posts'.
+    - _positions (dict): The position of every blog post, keyed by post ID.
+    - _indexes (PostIndexes): The date and author indexes, built on first use.
+    - _all_positions (list): The position of every blog post, built on the first sort of
+        all the posts so the following sorts don't create a new int object per post.
+
+    Methods:
+    - index_of(self, post_id): Returns the position of a blog post.
+    - indexes(self): Returns the date and author indexes of the posts.
+    - search(self, field, needle, positions=None): Returns the positions of the matching posts.
+    - sort(self, positions, field, reverse=False): Sorts post positions by a field.
+    - between(self, date_from=None, date_to=None): Filters the posts by date range.
+    - by_author(self, author): Filters the posts by author.
+    - warm_up(self): Builds the indexes ahead of the first queries.
+    """
+
+    def __init__(self, posts, revision=0, fold_accents=False, previous=None):
+        """
+        Initializes the PostTable instance.
+
+        :param posts: (list) The blog posts.
+        :param revision: (int) The write revision of the posts.
+        :param fold_accents: (bool) Whether searching ignores accents as well as case.
+        :param previous: (PostTable) The previous table, whose shadows can be reused.
+        """
+        reusable = {}
+        if previous is not None:
+            # Keyed by the fields themselves, so only equal posts share their values
+            reusable = {normalization_key(post): shadow
+                        for post, shadow in zip(previous.posts, previous._shadows)}
+
+        self.posts = posts
+        self.revision = revision
+        self._shadows = []
+        for post in posts:
+            shadow = reusable.get(normalization_key(post))
+            if shadow is None:
+                shadow = PostShadow(post, fold_accents)
+            self._shadows.append(shadow)
+        self._positions = {post['id']: position for position, post in enumerate(posts)}
+        self._indexes = None
+        self._all_positions = None
+
+    def __len__(self):
+        return len(self.posts)
+
+    def __getitem__(self, position):
+        return self.posts[position]
+
+    def index_of(self, post_id):
+        """
+        Returns the position of a blog post.
+
+        :param post_id: (int) The ID of the blog post.
+
+        :return: (int) The position of the blog post, or -1 if it does not exist.
+        """
+        return self._positions.get(post_id, -1)
+
+    def indexes(self):
+        """
+        Returns the date and author indexes of the posts, building them on first use.
+
+        :return: (PostIndexes) The indexes of the posts.
+        """
+        if self._indexes is None:
+            self._indexes = PostIndexes(self._shadows)
+        return self._indexes
+
+    def search(self, field, needle, positions=None):
+        """
+        Returns the positions of the blog posts whose normalized field contains a text.
+
+        :param field: (str) One of NORMALIZED_FIELDS.
+        :param needle: (str) The normalized text to look for.
+        :param positions: (list) The positions of the candidate posts, or None for all.
+
+        :return: (list) The positions of the matching blog posts, in the given order.
+        """
+        if positions is None:
+            positions = range(len(self.posts))
+        if not needle:
+            return list(positions)
+        shadows = self._shadows
+        field_index = NORMALIZED_FIELDS.index(field)
+        return [position for position in positions
+                if needle in shadows[position].search[field_index]]
+
+    def sort(self, positions, field, reverse=False):
+        """
+        Sorts post positions by a field, with the ordering of sort_if_necessary().
+
+        :param positions: (list) The positions of the blog posts to sort, or None for all.
+        :param field: (str) 'date', or one of SORTABLE_TEXT_FIELDS.
+        :param reverse: (bool) Whether to sort in descending order.
+
+        :return: (list) The sorted positions.
+        """
+        if positions is None:
+            if self._all_positions is None:
+                self._all_positions = list(range(len(self.posts)))
+            positions = self._all_positions
+
+        shadows = self._shadows
+        if field == 'date':
+            return sorted(positions, key=lambda position: shadows[position].sort_date,
+                          reverse=reverse)
+
+        # Two stable passes order the posts by their lowered first letter, then by their
+        # raw value, without building a key tuple or lowering a letter per post
+        posts = self.posts
+        field_index = SORTABLE_TEXT_FIELDS.index(field)
+        ordered = sorted(positions, key=lambda position: posts[position][field],
+                         reverse=reverse)
+        ordered.sort(key=lambda position: shadows[position].initials[field_index],
+                     reverse=reverse)
+        return ordered
+
+    def between(self, date_from=None, date_to=None):
+        """
+        Returns the positions of the blog posts created within a date range.
+
+        :param date_from: (date) The first day of the range, or None for no lower bound.
+        :param date_to: (date) The last day of the range (inclusive), or None for no upper bound.
+
+        :return: (list) The positions of the matching blog posts.
+        """
+        return self.indexes().positions_between(date_from, date_to)
+
+    def by_author(self, author):
+        """
+        Returns the positions of the blog posts of an author.
+
+        :param author: (str) The normalized author name.
+
+        :return: (list) The positions of the matching blog posts.
+        """
+        return self.indexes().positions_by_author(author)
+
+    def warm_up(self):
+        """
+        Builds the indexes ahead of the first queries.
+        """
+        self.indexes()
+
+
+def change_event(event_type, post_id, fields=None, total_posts=None):
+    """
+    Builds a compact post change event.
+
+    :param event_type: (str) One of 'created', 'updated', 'deleted' or 'liked'.
+    :param post_id: (int) The ID of the changed blog post.
+    :param fields: (dict) The changed fields of the blog post, if any.
+    :param total_posts: (int) The total number of blog posts after the change.
+
+    :return: (dict) The change event.
+    """
+    event = {'type': event_type, 'id': post_id}
+    if fields:
+        event['fields'] = fields
+    if total_posts is not None:
+        event['totalPosts'] = total_posts
+    return event
+
+
+class ChangeSubscriber:
+    """
+    A single client subscription to the posts change feed.
+
+    Every subscriber owns a bounded queue, so a slow client can never make the
+    feed (or the request that caused the change) wait. When the queue overflows
+    the pending events are discarded and replaced by a single 'resync' event,
+    telling the client to reload its current page instead of patching it.
+
+    Attributes:
+    - _events (queue.Queue): The pending change events for this client.
+    """
+
+    def __init__(self, max_pending=100):
+        """
+        Initializes the ChangeSubscriber instance.
+
+        :param max_pending: (int) The maximum number of events kept for a slow client.
+        """
+        self._events = queue.Queue(maxsize=max_pending)
+
+    def push(self, event):
+        """
+        Queues a change event without ever blocking the publisher.
+
+        :param event: (dict) The change event to deliver.
+        """
+        try:
+            self._events.put_nowait(event)
+        except queue.Full:
+            # The client is not keeping up: drop its backlog and ask it to resync
+            with self._events.mutex:
+                self._events.queue.clear()
+            self._events.put_nowait({'type': 'resync'})
+
+    def next_event(self, timeout=15):
+        """
+        Waits for the next change event.
+
+        :param timeout: (float) The number of seconds to wait for an event.
+
+        :return: (dict) The next change event, or None if the timeout expired.
+        """
+        try:
+            return self._events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class ChangeFeed:
+    """
+    Fans out compact post change events to all subscribed clients.
+
+    Methods:
+    - subscribe(self): Registers and returns a new ChangeSubscriber.
+    - unsubscribe(self, subscriber): Removes a subscriber from the feed.
+    - publish(self, event): Sends a change event to every subscriber.
+    """
+
+    def __init__(self):
+        """
+        Initializes the ChangeFeed instance.
+        """
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """
+        Registers a new subscriber.
+
+        :return: (ChangeSubscriber) The subscriber receiving the change events.
+        """
+        subscriber = ChangeSubscriber()
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """
+        Removes a subscriber from the feed.
+
+        :param subscriber: (ChangeSubscriber) The subscriber to remove.
+        """
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event):
+        """
+        Sends a change event to every subscriber.
+
+        :param event: (dict) The change event, as built by change_event(), or a 'resync'.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.push(event)
+
+
+def server_sent_events(subscriber, keep_alive_seconds=15):
+    """
+    Frames the change events of a subscriber as a Server-Sent Events stream.
+
+    Each event is named after its type and carries the whole event as JSON data. A comment
+    line is sent whenever no event arrived for a while, so the connection stays open.
+
+    :param subscriber: (ChangeSubscriber) The subscriber whose events are streamed.
+    :param keep_alive_seconds: (float) How long to wait for an event before a keep-alive.
+
+    :return: (generator) The stream, one message at a time.
+    """
+    # Tell the client the stream is live before the first change arrives
+    yield 'retry: 3000\n\n'
+    while True:
+        event = subscriber.next_event(timeout=keep_alive_seconds)
+        if event is None:
+            yield ': keep-alive\n\n'
+            continue
+        yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
 class DataHandler:
     """
     A class that handles data related to blog posts.
@@ -36,10 +436,25 @@ class DataHandler:
     - _posts (dict): A dictionary containing blog post data.
     - _file_name (str): The name of the file storing the blog post data.
     - _database_path (str): The full path to the blog post database file.
+    - _snapshot (PostSnapshot): The shared memory-mapped posts snapshot, in shared mode.
+    - _table (PostTable): The posts with their normalized fields, outside shared mode.
+    - _revision (int): The number of times the posts have been written.
+    - changes (ChangeFeed): The feed notified about every post mutation.
+    - _watcher (threading.Thread): The thread relaying the changes published in the shared
+        snapshot by every worker process, started by the first subscriber.
+    - load_seconds (float): How long initializing the DataHandler took.
+    - hydration_seconds (float): How long normalizing and indexing every post (or loading the
+        snapshot pages) took, or None while a lazy load is still hydrating in the background.
+    - hydrated (threading.Event): Set once the hydration has actually completed.
+    - ready (threading.Event): Set once the posts can be served. A lazy load without an
+        up-to-date snapshot only sets it after building the snapshot in the background.
 
     Methods:
-    - __init__(self, file_name): Initializes the DataHandler instance.
+    - __init__(self, file_name, shared_snapshot=False, fold_accents=False, lazy_load=False):
+        Initializes the DataHandler instance.
     - is_valid_json_file(self): Checks if the specified file is a valid JSON file.
+    - subscribe(self): Subscribes to the changes of the blog posts.
+    - unsubscribe(self, subscriber): Ends a subscription to the changes of the blog posts.
     - count(self): Returns the total number of blog posts.
     - fetch_post_by_id(self, post_id): Fetches a blog post based on its ID.
     - request_unique_id(self): Generates a unique ID for a new blog post.
@@ -48,28 +463,269 @@ class DataHandler:
     - delete_post(self, post_id): Deletes a blog post based on its ID.
     - update_post(self, post_id, updated_data): Updates the content of a blog post.
     - search_posts(self, request_args): Searches and filters blog posts based on criteria.
-    - get_posts(self, sort_by='title', direction='asc', page=1, page_size=10):
+    - get_posts(self, sort_by='title', direction='asc', page=1, page_size=10, filters=None):
         Retrieves and paginates blog posts.
+    - filter_posts(self, date_from=None, date_to=None, author=None, view=None):
+        Filters blog posts by date range and author using the indexes.
     """
 
-    def __init__(self, file_name):
+    def __init__(self, file_name, shared_snapshot=False, fold_accents=False, lazy_load=False):
         """
         Initializes the DataHandler instance.
 
+        In shared snapshot mode the posts, together with their normalized fields, are served
+        from a memory-mapped binary snapshot shared by all worker processes instead of a
+        private copy per process. An up-to-date snapshot is mapped without parsing the JSON
+        file at all. Writers take turns through a lock file and publish each new version
+        atomically.
+
+        Lazy load mode implies the shared snapshot mode, and warms the mapping up in a
+        background thread instead of before serving the first request. Without an
+        up-to-date snapshot, parsing the JSON file and building the snapshot moves to that
+        thread as well: the instance is returned right away, and the posts can only be
+        served once 'ready' is set.
+
         :param file_name: (str) The name of the file storing the blog post data.
+        :param shared_snapshot: (bool) Whether to serve the posts from the shared snapshot.
+        :param fold_accents: (bool) Whether searching ignores accents as well as case.
+        :param lazy_load: (bool) Whether to start from the snapshot and hydrate lazily.
         """
+        started = time.perf_counter()
         self._posts = []
         self._file_name = file_name
+        self._snapshot = None
+        self._table = None
+        self._table_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._revision = 0
+        self._loaded_stat = None
+        self._fold_accents = fold_accents
+        self.changes = ChangeFeed()
+        self._watcher = None
+        self._watcher_lock = threading.Lock()
 
         current_directory = os.getcwd()
         self._database_path = os.path.join(current_directory, 'database', self._file_name)
         print(self._database_path)
-        if self.is_valid_json_file():
-            print(f"\nThe '{self._file_name}' posts database file has been loaded successfully.")
-        else:
+
+        use_snapshot = shared_snapshot or lazy_load
+        if use_snapshot:
+            self._snapshot_path = os.path.splitext(self._database_path)[0] + '.snapshot'
+            self._lock_path = self._snapshot_path + '.lock'
+
+        self.hydration_seconds = None
+        self.hydrated = threading.Event()
+        self.ready = threading.Event()
+
+        if use_snapshot and self.is_snapshot_fresh():
+            # The snapshot already holds every post, there is no need to parse the JSON file
+            print(f"\nThe '{self._file_name}' posts snapshot has been mapped successfully.")
+            self._map_snapshot()
+        elif lazy_load:
+            print(f"\nThe '{self._file_name}' posts snapshot is being built in the background.")
+        elif not self._load_database(use_snapshot):
             print(f"Error: {self._file_name} is not a valid JSON file.")
             sys.exit()
 
+        if lazy_load:
+            self.hydrate_in_background()
+        else:
+            # Normalize (or map) every post once, up front, rather than on the first queries
+            self._hydrate()
+        self.load_seconds = time.perf_counter() - started
+
+    def _load_database(self, use_snapshot):
+        """
+        Loads the JSON database file and, in shared snapshot mode, publishes and maps the
+        snapshot of its posts. The 'ready' event is set once this has succeeded.
+
+        :param use_snapshot: (bool) Whether the posts are served from the shared snapshot.
+
+        :return: (bool) True if the database file is a valid JSON file, False otherwise.
+        """
+        if not self.is_valid_json_file():
+            return False
+        print(f"\nThe '{self._file_name}' posts database file has been loaded successfully.")
+        if use_snapshot:
+            self.publish_snapshot_if_stale()
+            self._map_snapshot()
+        else:
+            self.ready.set()
+        return True
+
+    def _map_snapshot(self):
+        """
+        Maps the published snapshot, and sets the 'ready' event.
+        """
+        self._snapshot = PostSnapshot(self._snapshot_path)
+        # Drop the private copy, the posts are read from the shared mapping from now on
+        self._posts = self._snapshot
+        self.ready.set()
+
+    def is_snapshot_fresh(self):
+        """
+        Checks whether the published snapshot is valid, normalized the same way, and at
+        least as recent as the JSON database file.
+
+        :return: (bool) True if the snapshot can be served as is, False otherwise.
+        """
+        try:
+            if os.path.getmtime(self._snapshot_path) < os.path.getmtime(self._database_path):
+                return False
+            return PostSnapshot(self._snapshot_path).fold_accents == self._fold_accents
+        except (OSError, SnapshotError):
+            return False
+
+    def hydrate_in_background(self):
+        """
+        Warms the posts snapshot up in a background thread, after building it first if it
+        was not up to date.
+
+        Once 'ready' is set, requests are served straight from the snapshot; they only fault
+        in the pages they touch themselves.
+        """
+        def load_and_hydrate():
+            if not self.ready.is_set() and not self._load_database(use_snapshot=True):
+                print(f"Error: {self._file_name} is not a valid JSON file.")
+                # Like a failing startup, since the posts would never be served
+                os._exit(1)
+            self._hydrate()
+
+        thread = threading.Thread(target=load_and_hydrate, name='posts-hydration', daemon=True)
+        thread.start()
+
+    def _hydrate(self):
+        """
+        Normalizes and indexes every post (or loads the pages of the snapshot), and records
+        how long it took. The 'hydrated' event is only set once this has succeeded.
+        """
+        started = time.perf_counter()
+        for attempt in range(1, HYDRATION_ATTEMPTS + 1):
+            try:
+                # Every attempt works on one pinned view, whatever the writers publish meanwhile
+                self._view().warm_up()
+                break
+            except Exception as error:
+                # A failing background thread would otherwise leave the posts unhydrated
+                # for the lifetime of the process, without anybody noticing
+                print(f"Error: hydrating the posts failed (attempt {attempt}): {error}")
+        else:
+            return
+        self.hydration_seconds = time.perf_counter() - started
+        self.hydrated.set()
+
+    def _database_stat(self):
+        """
+        Returns the modification time and size of the JSON database file.
+
+        :return: (tuple) The modification time in nanoseconds and the size of the file, or
+                 None if the file does not exist.
+        """
+        try:
+            stat = os.stat(self._database_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def publish_snapshot_if_stale(self):
+        """
+        Publishes a snapshot of the loaded posts unless an up-to-date one already exists.
+
+        The snapshot is considered stale when it is missing, corrupted, normalized another
+        way, or older than the JSON database file (e.g. after the file has been edited by
+        hand).
+        """
+        with SnapshotWriteLock(self._lock_path):
+            try:
+                published = PostSnapshot(self._snapshot_path)
+            except SnapshotError:
+                write_snapshot(self._snapshot_path, self._posts, 1, self._fold_accents)
+                return
+
+            if (os.path.getmtime(self._snapshot_path) < os.path.getmtime(self._database_path)
+                    or published.fold_accents != self._fold_accents):
+                # Another process may have written the database since we loaded it
+                self.is_valid_json_file()
+                write_snapshot(self._snapshot_path, self._posts, published.version + 1,
+                               self._fold_accents)
+
+    def _view(self):
+        """
+        Returns the current blog posts together with their normalized fields.
+
+        In shared snapshot mode that is the mapped snapshot itself, so readers never see the
+        private copy of a snapshot writer. Otherwise the table is only built again after the
+        posts have been reloaded or written, and even then only the new or changed posts are
+        normalized again.
+
+        :return: (PostTable | PostSnapshot) The view of the current blog posts.
+        """
+        if self._snapshot is not None:
+            return self._snapshot
+
+        posts = self._posts
+        # The background hydration and the request threads must not build it twice
+        with self._table_lock:
+            table = self._table
+            if table is None or table.posts is not posts or table.revision != self._revision:
+                table = PostTable(posts, self._revision, self._fold_accents, table)
+                self._table = table
+            return table
+
+    def filter_posts(self, date_from=None, date_to=None, author=None, view=None):
+        """
+        Returns the blog posts matching the date-range and author filters, using the indexes.
+
+        The candidate sets of the filters are intersected smallest first, and only the
+        positions left afterwards are returned, in the stored order of the posts.
+
+        :param date_from: (date) The first day of the date range, or None.
+        :param date_to: (date) The last day of the date range (inclusive), or None.
+        :param author: (str) The author name to match exactly, ignoring case, or None.
+        :param view: (PostTable | PostSnapshot) The posts to filter, by default the current ones.
+
+        :return: (list) The positions of the matching blog posts, or None if no filter was
+                 given.
+        """
+        # Without any filter, don't build (or wait for) the indexes at all
+        if date_from is None and date_to is None and not author:
+            return None
+
+        candidate_sets = []
+        view = view if view is not None else self._view()
+        if date_from is not None or date_to is not None:
+            candidate_sets.append(view.between(date_from, date_to))
+        if author:
+            candidate_sets.append(view.by_author(normalize_text(author, self._fold_accents)))
+        candidate_sets.sort(key=len)
+        positions = set(candidate_sets[0])
+        for candidates in candidate_sets[1:]:
+            if not positions:
+                break
+            positions.intersection_update(candidates)
+        return sorted(positions)
+
+    @contextmanager
+    def _writing(self):
+        """
+        Context manager wrapping every mutation of the blog posts.
+
+        It makes the calling thread the only writer of this process and, in shared snapshot
+        mode, this process the only writer of all the worker processes. It yields the posts
+        the mutation starts from: the loaded list in JSON mode, or the latest published
+        snapshot version in shared mode. The mutation builds its own list from them and
+        hands it to write_posts(), so the reading threads never see it halfway through.
+        """
+        with self._write_lock:
+            if self._snapshot is None:
+                self.read_posts()
+                yield self._posts
+                return
+
+            with SnapshotWriteLock(self._lock_path):
+                # Nobody else publishes while the lock is held, so this stays the latest
+                yield self._snapshot.latest()
+
     def is_valid_json_file(self):
         """
         Checks if the specified file is a valid JSON file.
@@ -81,22 +737,73 @@ class DataHandler:
         try:
             with open(self._database_path, 'r', encoding='utf-8') as file:
                 self._posts = json.load(file)
-                return True
+            self._loaded_stat = self._database_stat()
+            return True
         except FileNotFoundError:
             # File does not exist, create it
-            with open(self._database_path, 'w', encoding='utf-8') as file:
-                json.dump(self._posts, file, indent=4)
+            self._replace_database(self._posts)
+            self._loaded_stat = self._database_stat()
             return True
         except json.JSONDecodeError:
             return False
 
+    def subscribe(self):
+        """
+        Subscribes to the changes of the blog posts.
+
+        In shared snapshot mode the posts may be changed by any worker process, so the
+        first subscription starts a thread relaying the changes embedded in every new
+        snapshot version to the local change feed.
+
+        :return: (ChangeSubscriber) The subscriber receiving the change events.
+        """
+        if self._snapshot is not None:
+            with self._watcher_lock:
+                if self._watcher is None:
+                    self._watcher = threading.Thread(target=self._watch_snapshot,
+                                                     args=(self._snapshot.latest(),),
+                                                     name='snapshot-changes', daemon=True)
+                    self._watcher.start()
+        return self.changes.subscribe()
+
+    def unsubscribe(self, subscriber):
+        """
+        Ends a subscription to the changes of the blog posts.
+
+        :param subscriber: (ChangeSubscriber) The subscriber returned by subscribe().
+        """
+        self.changes.unsubscribe(subscriber)
+
+    def _watch_snapshot(self, watched):
+        """
+        Relays the changes of every new snapshot version to the local change feed.
+
+        If versions were published without their change (e.g. after the JSON database was
+        edited by hand), or faster than they could be relayed, the subscribers are asked
+        to resync instead.
+
+        :param watched: (PostSnapshot) The snapshot version to start watching from.
+        """
+        while True:
+            time.sleep(SNAPSHOT_POLL_SECONDS)
+            latest = watched.latest()
+            if latest is watched:
+                continue
+            changes = latest.changes_since(watched.version)
+            if changes is None:
+                self.changes.publish({'type': 'resync'})
+            else:
+                for change in changes:
+                    self.changes.publish(change)
+            watched = latest
+
     def count(self):
         """
         Returns the total number of blog posts.
 
         :return: (int) The total number of blog posts.
         """
-        return len(self._posts)
+        return len(self._snapshot if self._snapshot is not None else self._posts)
 
     def fetch_post_by_id(self, post_id):
         """
@@ -108,20 +815,25 @@ class DataHandler:
                     otherwise returns None and -1.
         """
         self.read_posts()
-        for idx, post in enumerate(self._posts):
-            if post['id'] == post_id:
-                return post, idx
-        return None, -1
+        view = self._view()
+        idx = view.index_of(post_id)
+        if idx < 0:
+            return None, -1
+        return view[idx], idx
 
-    def request_unique_id(self):
+    def request_unique_id(self, posts=None):
         """
         Generates a unique ID for a new blog post.
 
+        :param posts: (list) The blog posts the new post is added to, by default the
+                      current ones.
+
         :return: (int) A unique ID for a new blog post.
         """
-        if len(self._posts) == 0:
+        posts = self._posts if posts is None else posts
+        if len(posts) == 0:
             return 1
-        return self._posts[-1]['id'] + 1
+        return posts[-1]['id'] + 1
 
     def read_posts(self):
         """
@@ -130,6 +842,15 @@ class DataHandler:
         This function reads the contents of the blog post database file specified during
         initialization and updates the internal `_posts` attribute with the loaded data.
         """
+        if self._snapshot is not None:
+            # Pick up the versions published by other processes
+            self._snapshot = self._posts = self._snapshot.latest()
+            return
+
+        # Nothing to re-read if the file has not changed since it was loaded or written
+        if self._loaded_stat is not None and self._database_stat() == self._loaded_stat:
+            return
+
         # Invoke is_valid_json_file() to guarantee the file is loaded. If there's a necessity
         # to recreate the file, this operation will be performed. Additionally, any existing
         # posts will be saved to the newly created file  in case the file has been moved
@@ -141,18 +862,134 @@ class DataHandler:
         #     # Load the JSON data from the file and update the internal posts data
         #     self._posts = json.load(file)
 
-    def write_posts(self):
+    def _replace_database(self, posts=None, records=None):
+        """
+        Atomically replaces the database file with the given posts.
+
+        The posts are written to a temporary file first, so a failing write never leaves a
+        truncated database behind. In shared snapshot mode they are written from their
+        snapshot records, one post per line, so they are not encoded a second time.
+
+        :param posts: (list) The blog posts to write, in JSON mode.
+        :param records: (iterable) The blog posts encoded by encode_post(), in shared mode.
         """
-        Writes the current state of blog posts to the database file.
+        directory = os.path.dirname(self._database_path)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                if records is None:
+                    # Write the posts data to the file in JSON format with indentation
+                    file.write(json.dumps(posts, indent=4).encode('utf-8'))
+                else:
+                    file.write(b'[')
+                    separator = b'\n'
+                    for record in records:
+                        file.write(separator)
+                        file.write(record)
+                        separator = b',\n'
+                    file.write(b'\n]\n')
+            os.replace(temp_path, self._database_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def _next_version(self, change):
+        """
+        Prepares the publication of the next snapshot version, once the database file has
+        been written.
+
+        :param change: (dict) The change event describing the write, if any.
+
+        :return: (tuple) The latest snapshot version, the next version number, and the
+                 latest changes including this one.
+        """
+        self._loaded_stat = self._database_stat()
+        self._revision += 1
+        base = self._snapshot.latest()
+        version = base.version + 1
+        changes = base.recent_changes()
+        if change is not None:
+            changes.append((version, change))
+        return base, version, changes
+
+    def write_posts(self, posts, change=None):
+        """
+        Writes a new state of the blog posts to the database file, and makes it current.
+
+        The posts are written in JSON format with an indentation of 4 spaces. Only call this
+        within _writing(), with the list the mutation has built.
+
+        The change event is published to the change feed once the posts are written. In
+        shared snapshot mode it travels inside the new snapshot version instead, so the
+        subscribers of every worker process receive it (see subscribe()). Every column of
+        the new version is built again, which takes a while for large post stores; see
+        write_post() for the writes that can avoid it.
+
+        :param posts: (list) The new blog posts.
+        :param change: (dict) The change event describing the write, if any.
+        """
+        if self._snapshot is None:
+            self._replace_database(posts)
+            self._loaded_stat = self._database_stat()
+            self._revision += 1
+            self._posts = posts
+            if change is not None:
+                self.changes.publish(change)
+            return
+
+        # Publish the new version, and the latest changes, for every worker process
+        records = [encode_post(post) for post in posts]
+        self._replace_database(records=records)
+        base, version, changes = self._next_version(change)
+        write_snapshot(self._snapshot_path, posts, version, self._fold_accents, changes, records)
+        self._snapshot = self._posts = base.latest()
+
+    def write_post(self, idx, post, change=None):
+        """
+        Replaces a single blog post, and writes the new state of the blog posts.
+
+        In shared snapshot mode, as long as none of the INDEXED_FIELDS changes (e.g. for a
+        like), only the record of the post is replaced: the posts are neither decoded nor
+        packed again. Only call this within _writing().
+
+        :param idx: (int) The index of the blog post to replace.
+        :param post: (dict) The new blog post.
+        :param change: (dict) The change event describing the write, if any.
+        """
+        if self._snapshot is None:
+            posts = list(self._posts)
+            posts[idx] = post
+            self.write_posts(posts, change)
+            return
+
+        base = self._snapshot.latest()
+        previous = base[idx]
+        if any(previous.get(field) != post.get(field) for field in INDEXED_FIELDS):
+            # The columns built from the changed fields must be built again
+            posts = base.to_list()
+            posts[idx] = post
+            self.write_posts(posts, change)
+            return
+
+        record = encode_post(post)
+        self._replace_database(records=(record if index == idx else other
+                                        for index, other in enumerate(base.records())))
+        base, version, changes = self._next_version(change)
+        patch_snapshot(self._snapshot_path, base, idx, post, version, changes)
+        self._snapshot = self._posts = base.latest()
+
+    def _index_in(self, base, post_id):
+        """
+        Returns the index of a blog post in the posts a mutation starts from.
 
-        This function writes the current state of the internal `_posts` attribute to
-        the blog post database file specified during initialization. The data is written
-        in JSON format with an indentation of 4 spaces.
+        :param base: (list | PostSnapshot) The posts yielded by _writing().
+        :param post_id: (int) The ID of the blog post.
+
+        :return: (int) The index of the blog post, or -1 if it does not exist.
         """
-        # Open the database file in write mode
-        with open(self._database_path, 'w') as file:
-            # Write the internal posts data to the file in JSON format with indentation
-            json.dump(self._posts, file, indent=4)
+        if self._snapshot is not None:
+            return base.index_of(post_id)
+        return next((idx for idx, post in enumerate(base) if post.get('id') == post_id), -1)
 
     def increase_post_likes(self, post_id):
         """
@@ -162,23 +999,30 @@ class DataHandler:
 
         :return: (bool) True if the like count was increased successfully, False otherwise.
         """
-        for post in self._posts:
-            req_post_id = post.get('id')
-            if req_post_id == post_id:
-                post['likes'] = post.get('likes', 0) + 1
-                self.write_posts()
-                return True
-        return False
+        with self._writing() as base:
+            idx = self._index_in(base, post_id)
+            if idx < 0:
+                return False
+            post = dict(base[idx])
+            post['likes'] = post.get('likes', 0) + 1
+            self.write_post(idx, post, change_event('liked', post_id, {'likes': post['likes']}))
+            return True
 
     def save_post(self, new_post):
         """
         Saves a new blog post.
 
-        :param new_post: (dict) The dictionary containing the new blog post data.
+        :param new_post: (dict) The dictionary containing the new blog post data. Its 'id'
+                         is assigned here.
         """
-        self.read_posts()
-        self._posts.append(new_post)
-        self.write_posts()
+        with self._writing() as base:
+            posts = list(base)
+            # The ID is assigned under the write lock, so two writers never hand out the
+            # same one
+            new_post['id'] = self.request_unique_id(posts)
+            posts.append(new_post)
+            self.write_posts(posts, change_event('created', new_post['id'], new_post,
+                                                 len(posts)))
 
     def delete_post(self, post_id):
         """
@@ -188,12 +1032,14 @@ class DataHandler:
 
         :return: (bool) True if the blog post was deleted successfully, False otherwise.
         """
-        self.read_posts()
-        for post in self._posts:
-            if post['id'] == post_id:
-                self._posts.remove(post)
-                self.write_posts()
-                return True
+        with self._writing() as base:
+            posts = list(base)
+            for idx, post in enumerate(posts):
+                if post['id'] == post_id:
+                    del posts[idx]
+                    self.write_posts(posts, change_event('deleted', post_id,
+                                                         total_posts=len(posts)))
+                    return True
         return False
 
     def update_post(self, post_id, updated_data):
@@ -205,26 +1051,36 @@ class DataHandler:
 
         :return: The updated blog post data if successful, None otherwise.
         """
-        post, idx = self.fetch_post_by_id(post_id)
-        if post is None:
-            raise PostNotFoundError("Post not found for update.")
-
-        if not updated_data or all(value is None or value == '' for value in updated_data.values()):
-            raise NoValidDataError("No valid data provided for update.")
-
-        updated_post = {'id': post['id'],
-                        'date': post['date'],
-                        'author': updated_data.get('author', post['author']),
-                        'title': updated_data.get('title', post['title']),
-                        'content': updated_data.get('content', post['content']),
-                        'sort_date': post['sort_date']}
-
-        if 'likes' in post:
-            updated_post['likes'] = post['likes']
-
-        self._posts[idx] = updated_post
-        self.write_posts()
-        return updated_post
+        with self._writing() as base:
+            idx = self._index_in(base, post_id)
+            if idx < 0:
+                raise PostNotFoundError("Post not found for update.")
+            post = base[idx]
+
+            if not updated_data or all(value is None or value == ''
+                                       for value in updated_data.values()):
+                raise NoValidDataError("No valid data provided for update.")
+
+            updated_post = {'id': post['id'],
+                            'date': post['date'],
+                            'author': updated_data.get('author', post['author']),
+                            'title': updated_data.get('title', post['title']),
+                            'content': updated_data.get('content', post['content']),
+                            'sort_date': post['sort_date']}
+
+            if 'likes' in post:
+                updated_post['likes'] = post['likes']
+
+            # Only the fields that actually changed travel over the change feed
+            changed_fields = {key: updated_post[key] for key in ('author', 'title', 'content')
+                              if updated_post[key] != post[key]}
+
+            # Without any actual change there is nothing to write, nor to tell the subscribers;
+            # in shared mode a version without its change would make them all resync
+            if changed_fields:
+                self.write_post(idx, updated_post,
+                                change_event('updated', post_id, changed_fields))
+            return updated_post
 
     def search_posts(self, request_args):
         """
@@ -238,14 +1094,24 @@ class DataHandler:
         search_by_mapping = {'title': 'title', 'author': 'author', 'content': 'content',
                              'date': 'date'}
 
+        # Pick up the snapshot versions published by other worker processes
+        if self._snapshot is not None:
+            self.read_posts()
+
         # Extract search criteria from request_args
-        search_for = request_args.get('search_for', '').lower()
+        search_for = normalize_text(request_args.get('search_for', ''), self._fold_accents)
 
         # Get the corresponding post key based on search_by
         post_key = search_by_mapping.get(request_args.get('search_by', ''), 'title')
 
-        # Filter posts based on the search criteria
-        filtered_posts = [post for post in self._posts if search_for in post[post_key].lower()]
+        # Narrow the candidates down with the date-range and author indexes first
+        view = self._view()
+        candidates = self.filter_posts(request_args.get('date_from'),
+                                       request_args.get('date_to'),
+                                       request_args.get('author'), view)
+
+        # Filter posts based on the search criteria, using the precomputed normalized fields
+        filtered_posts = view.search(post_key, search_for, candidates)
 
         # If no posts match the search criteria, return an empty response
         if not filtered_posts:
@@ -260,12 +1126,12 @@ class DataHandler:
         # Calculate the start and end indices for the current page
         start_index, end_index = (page - 1) * page_size, (page - 1 + 1) * page_size
 
-        current_page_posts = sort_if_necessary(sort_by, direction, filtered_posts,
+        current_page_posts = sort_if_necessary(sort_by, direction, view, filtered_posts,
                                                start_index, end_index)
         # Create the response data containing the current page posts and total posts count
         return {'posts': current_page_posts, 'totalPosts': len(filtered_posts)}
 
-    def get_posts(self, sort_by='title', direction='asc', page=1, page_size=10):
+    def get_posts(self, sort_by='title', direction='asc', page=1, page_size=10, filters=None):
         """
             Retrieves and paginates blog posts.
 
@@ -274,6 +1140,7 @@ class DataHandler:
                 default: 'asc').
             :param page: (int) The current page number (default: 1).
             :param page_size: (int) The number of posts per page (default: 10).
+            :param filters: (dict) Optional 'date_from', 'date_to' and 'author' filters.
 
             :return: (dict) A dictionary containing the current page posts and total posts count.
         """
@@ -284,32 +1151,29 @@ class DataHandler:
         # Read blog posts from the data source
         self.read_posts()
 
-        if sort_by in ['title', 'content', 'author', 'date']:
-            if sort_by == 'date':
-                # Sort by date in ascending or descending order
-                sorted_posts = sorted(self._posts,
-                                      key=lambda post: datetime.strptime(post['sort_date'],
-                                                                         "%a, %b %d, %Y %H:%M:%S"),
-                                      reverse=direction == 'desc')
-            else:
-                # Sort by other fields (title, content, author) in ascending or descending order
-                sorted_posts = sorted(self._posts,
-                                      key=lambda post: (post[sort_by][0].lower(), post[sort_by]),
-                                      reverse=direction == 'desc')
-            current_page_posts = sorted_posts[start_index:end_index]
-        else:
-            # If no specific sorting criteria is specified, use the original order
-            current_page_posts = self._posts[start_index:end_index]
+        # Unsorted, unfiltered pages don't need the normalized fields, so they are served
+        # even while a lazy load is still hydrating
+        posts = self._snapshot if self._snapshot is not None else self._posts
+        view, positions = posts, None
+        filtered = filters is not None and any(filters.values())
+        if sort_by or filtered:
+            view = self._view()
+            if filtered:
+                positions = self.filter_posts(filters.get('date_from'), filters.get('date_to'),
+                                              filters.get('author'), view)
+
+        current_page_posts = sort_if_necessary(sort_by, direction, view, positions,
+                                               start_index, end_index)
 
         # Create the response data containing the current page posts and total posts count
         response_data = {
             'posts': current_page_posts,
-            'totalPosts': self.count()
+            'totalPosts': len(posts) if positions is None else len(positions)
         }
         return response_data
 
 
-def sort_if_necessary(sort_by, direction, filtered_posts, start_index, end_index):
+def sort_if_necessary(sort_by, direction, posts, positions, start_index, end_index):
     """
     Sorts a list of blog posts based on specified parameters if sorting is necessary.
 
@@ -317,7 +1181,9 @@ def sort_if_necessary(sort_by, direction, filtered_posts, start_index, end_index
         sort_by (str): The field by which to sort the blog posts ('title', 'content', 'author',
                         'date').
         direction (str): The sorting direction ('asc' for ascending, 'desc' for descending).
-        filtered_posts (list): The list of blog posts to be sorted.
+        posts (PostTable | PostSnapshot): The blog posts with their normalized fields.
+                        Without sorting, any sequence of blog posts will do.
+        positions (list): The positions of the blog posts to be sorted, or None for all.
         start_index (int): The starting index for pagination.
         end_index (int): The ending index for pagination.
 
@@ -327,11 +1193,12 @@ def sort_if_necessary(sort_by, direction, filtered_posts, start_index, end_index
     Sorting Logic:
     - If 'sort_by' is in ['title', 'content', 'author', 'date'], sorts the list accordingly.
     - For 'date', uses the 'sort_date' field in ascending or descending order.
-    - For other fields ('title', 'content', 'author'), uses a case-insensitive sort.
+    - For other fields ('title', 'content', 'author'), sorts by the lowered first letter,
+      then by the raw value.
     - Returns a sublist of sorted blog posts based on the provided pagination indices.
 
     Example Usage:
-    sorted_posts = sort_if_necessary('date', 'asc', blog_posts, 0, 10)
+    sorted_posts = sort_if_necessary('date', 'asc', table, None, 0, 10)
 
     Example Response:
     [
@@ -347,16 +1214,8 @@ def sort_if_necessary(sort_by, direction, filtered_posts, start_index, end_index
     ]
     """
     if sort_by in ['title', 'content', 'author', 'date']:
-        if sort_by == 'date':
-            # Sort by date in ascending or descending order
-            sorted_posts = sorted(filtered_posts,
-                                  key=lambda post: datetime.strptime(post['sort_date'],
-                                                                     "%a, %b %d, %Y %H:%M:%S"),
-                                  reverse=direction == 'desc')
-        else:
-            # Sort by other fields (title, content, author) in ascending or descending order
-            sorted_posts = sorted(filtered_posts,
-                                  key=lambda post: (post[sort_by][0].lower(), post[sort_by]),
-                                  reverse=direction == 'desc')
-        return sorted_posts[start_index:end_index]
-    return filtered_posts[start_index:end_index]
+        positions = posts.sort(positions, sort_by, reverse=direction == 'desc')
+    elif positions is None:
+        positions = range(len(posts))
+    # Only the posts of the requested page are fetched
+    return [posts[position] for position in positions[start_index:end_index]]
@@ -0,0 +1,94 @@
+"""
+normalization.py
+This module implements the normalization of the blog post fields used for searching,
+sorting and filtering. It is shared by the in-memory posts table and the posts snapshot,
+so both order and match the posts exactly the same way.
+
+Constants:
+- NORMALIZED_FIELDS: The fields that can be searched case-insensitively.
+- SORTABLE_TEXT_FIELDS: The text fields the posts can be sorted by.
+- SORT_DATE_FORMAT: The format of the 'sort_date' field used to sort posts by date.
+
+Functions:
+- normalize_text: Normalizes a text for case-insensitive matching.
+- sort_initial: Returns the lowered first letter a text field is sorted by.
+- normalization_key: Returns the fields a post is normalized from.
+- sort_timestamp: Converts the 'sort_date' of a post into a sortable timestamp.
+- day_timestamp: Returns the timestamp of the start of a day.
+"""
+
+import calendar
+import unicodedata
+from datetime import datetime
+
+# The fields that can be searched, and sorted by, case-insensitively
+NORMALIZED_FIELDS = ('title', 'author', 'content', 'date')
+
+# The text fields sorted by their lowered first letter, then by their raw value
+SORTABLE_TEXT_FIELDS = ('title', 'author', 'content')
+
+# The format of the 'sort_date' field used to sort posts by date
+SORT_DATE_FORMAT = "%a, %b %d, %Y %H:%M:%S"
+
+
+def normalize_text(text, fold_accents=False):
+    """
+    Normalizes a text for case-insensitive (and optionally accent-insensitive) matching.
+
+    :param text: (str) The text to normalize.
+    :param fold_accents: (bool) Whether to strip accents, so that 'café' matches 'cafe'.
+
+    :return: (str) The normalized text.
+    """
+    normalized = text.lower()
+    if fold_accents:
+        normalized = ''.join(char for char in unicodedata.normalize('NFKD', normalized)
+                             if not unicodedata.combining(char))
+    return normalized
+
+
+def sort_initial(text):
+    """
+    Returns the lowered first letter a text field is sorted by, before its raw value.
+
+    :param text: (str) The value of the text field.
+
+    :return: (str) The lowered first letter, or '' for an empty text.
+    """
+    return text[:1].lower()
+
+
+def normalization_key(post):
+    """
+    Returns the fields a post is normalized from.
+
+    Two posts with equal keys share the same normalized values, so the values of an
+    unchanged post can be reused after the posts have been reloaded.
+
+    :param post: (dict) The blog post.
+
+    :return: (tuple) The normalized fields of the post, in a fixed order.
+    """
+    return post['title'], post['author'], post['content'], post['date'], post['sort_date']
+
+
+def sort_timestamp(sort_date):
+    """
+    Converts the 'sort_date' of a post into a timestamp sorting the same way.
+
+    :param sort_date: (str) The 'sort_date' of the post.
+
+    :return: (int) The number of seconds since the epoch.
+    """
+    return calendar.timegm(datetime.strptime(sort_date, SORT_DATE_FORMAT).timetuple())
+
+
+def day_timestamp(day):
+    """
+    Returns the timestamp of the start of a day, comparable with sort_timestamp().
+
+    :param day: (date) The day.
+
+    :return: (int) The number of seconds since the epoch.
+    """
+    return calendar.timegm(day.timetuple())
@@ -0,0 +1,615 @@
+"""
+snapshot.py
+This module implements an immutable, memory-mapped binary snapshot of the blog posts,
+shared by every worker process serving the Masterblog API.
+
+Besides the posts themselves, the snapshot packs the normalized values used for
+searching, sorting and filtering, so a worker answers those queries straight from the
+shared mapping without decoding the posts or keeping a private copy of the values.
+
+Snapshot layout:
+- Header (little-endian): magic b'MBPS', format (uint32), flags (uint32), number of
+  sections (uint32), version (uint64), count (uint64).
+- Section table (little-endian): the offset and length (uint64) of every section of
+  _SECTIONS, in that order. Every section starts on an 8-byte boundary.
+- Sections: the columns described in _SECTIONS, in the native byte order of the host,
+  since the snapshot is only ever shared between processes of one machine.
+
+A snapshot file is never modified in place. The writer builds the next version in a
+temporary file and atomically renames it over the previous one, so readers keep
+serving their mapped version until they pick up the new file.
+
+Classes:
+- PostSnapshot: A read-only sequence of posts backed by a memory-mapped snapshot file.
+- SnapshotWriteLock: An inter-process lock serializing snapshot writers.
+
+Functions:
+- encode_post: Encodes a post the way it is stored in a snapshot.
+- write_snapshot: Atomically publishes a new snapshot version of the given posts.
+- patch_snapshot: Atomically publishes a new snapshot version with one post replaced.
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+from database.normalization import (NORMALIZED_FIELDS, SORTABLE_TEXT_FIELDS, day_timestamp,
+                                    normalize_text, sort_initial, sort_timestamp)
+
+try:
+    import fcntl
+except ImportError:
+    # Platforms without fcntl run a single process, so there is nobody to lock against
+    fcntl = None
+
+SNAPSHOT_MAGIC = b'MBPS'
+SNAPSHOT_FORMAT = 3
+
+# The number of latest change events kept in a snapshot for the other worker processes
+SNAPSHOT_CHANGES = 32
+
+# The fields the columns of a snapshot are built from, besides the records themselves
+INDEXED_FIELDS = ('id', 'sort_date') + NORMALIZED_FIELDS
+
+# Header flag telling that the searchable text has been folded to strip accents
+FLAG_FOLD_ACCENTS = 1
+
+# The sections of a snapshot, with the array type code of their items ('' for raw bytes).
+# The positions of the posts are their indexes in the stored order.
+_SECTIONS = (
+    ('record_offsets', 'Q'),        # count + 1 offsets of the records
+    ('records', ''),                # every post, as a UTF-8 encoded JSON object
+    ('sorted_ids', 'q'),            # the post IDs, in ascending order
+    ('id_order', 'I'),              # the positions of the posts, ordered by ID
+    ('timestamps', 'q'),            # the 'sort_date' timestamp of every post
+    ('sorted_timestamps', 'q'),     # the same timestamps, in ascending order
+    ('date_order', 'I'),            # the positions of the posts, ordered by timestamp
+    ('author_order', 'I'),          # the positions of the posts, ordered by normalized author
+) + tuple(
+    (f'rank_{field}', 'I') for field in SORTABLE_TEXT_FIELDS     # the sort rank of every post
+) + tuple(
+    section for field in NORMALIZED_FIELDS for section in (
+        (f'text_{field}', ''),             # the normalized values, each one preceded by b'\x00'
+        (f'text_{field}_offsets', 'Q'),    # count + 1 offsets of the values in the text
+    )
+) + (
+    ('changes', ''),                # the latest [version, change event] pairs, as JSON
+)
+
+_HEADER = struct.Struct('<4sIIIQQ')
+_SECTION = struct.Struct('<QQ')
+
+
+class SnapshotError(Exception):
+    """Exception for the case where a snapshot file is missing or corrupted."""
+
+    def __init__(self, message="The posts snapshot file is not valid."):
+        self.message = message
+        super().__init__(self.message)
+
+
+def _dense_ranks(keys):
+    """
+    Ranks sort keys, giving equal keys the same rank.
+
+    Sorting stably by rank then gives exactly the order of sorting stably by key, in both
+    directions.
+
+    :param keys: (list) The sort key of every post.
+
+    :return: (list) The rank of every post.
+    """
+    ranks = [0] * len(keys)
+    rank, previous = -1, None
+    for position in sorted(range(len(keys)), key=keys.__getitem__):
+        if rank < 0 or keys[position] != previous:
+            rank, previous = rank + 1, keys[position]
+        ranks[position] = rank
+    return ranks
+
+
+def _text_section(values):
+    """
+    Packs normalized values into a text column searchable without decoding it.
+
+    :param values: (list) The UTF-8 encoded values, free of b'\\x00'.
+
+    :return: (tuple) The text and the count + 1 offsets of the values in it.
+    """
+    text = b'\x00' + b'\x00'.join(values) + b'\x00'
+    offsets = [1]
+    for value in values:
+        offsets.append(offsets[-1] + len(value) + 1)
+    return text, array('Q', offsets).tobytes()
+
+
+def _changes_section(changes):
+    """
+    Packs the latest change events of a snapshot.
+
+    :param changes: (list) The latest (version, change event) pairs, oldest first.
+
+    :return: (bytes) The last SNAPSHOT_CHANGES pairs, as JSON.
+    """
+    return json.dumps([list(change) for change in changes][-SNAPSHOT_CHANGES:],
+                      separators=(',', ':')).encode('utf-8')
+
+
+def _publish(path, sections, version, count, fold_accents):
+    """
+    Writes the sections of a new snapshot version to a temporary file and atomically
+    renames it over the previous version.
+
+    :param path: (str) The path of the snapshot file.
+    :param sections: (dict) The bytes of every section of _SECTIONS, keyed by name.
+    :param version: (int) The version number of the new snapshot.
+    :param count: (int) The number of posts in the snapshot.
+    :param fold_accents: (bool) Whether the searchable text ignores accents as well as case.
+    """
+    table = []
+    offset = _HEADER.size + len(_SECTIONS) * _SECTION.size
+    for name, _ in _SECTIONS:
+        offset += -offset % 8
+        table.append((offset, len(sections[name])))
+        offset += len(sections[name])
+
+    # Build the new version next to the old one so the rename stays atomic
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            flags = FLAG_FOLD_ACCENTS if fold_accents else 0
+            file.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, flags, len(_SECTIONS),
+                                    version, count))
+            for entry in table:
+                file.write(_SECTION.pack(*entry))
+            for (name, _), (section_offset, _) in zip(_SECTIONS, table):
+                file.write(b'\x00' * (section_offset - file.tell()))
+                file.write(sections[name])
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def encode_post(post):
+    """
+    Encodes a post the way it is stored in a snapshot record.
+
+    :param post: (dict) The blog post.
+
+    :return: (bytes) The post, as a compact UTF-8 encoded JSON object.
+    """
+    return json.dumps(post, separators=(',', ':')).encode('utf-8')
+
+
+def write_snapshot(path, posts, version, fold_accents=False, changes=(), records=None):
+    """
+    Atomically publishes a new snapshot version of the given posts.
+
+    :param path: (str) The path of the snapshot file.
+    :param posts: (list) The blog posts to pack into the snapshot.
+    :param version: (int) The version number of the new snapshot.
+    :param fold_accents: (bool) Whether the searchable text ignores accents as well as case.
+    :param changes: (list) The latest (version, change event) pairs, oldest first; only the
+                    last SNAPSHOT_CHANGES are kept.
+    :param records: (list) The posts encoded by encode_post(), if already done.
+    """
+    count = len(posts)
+    positions = range(count)
+    if records is None:
+        records = [encode_post(post) for post in posts]
+    record_offsets = [0]
+    for record in records:
+        record_offsets.append(record_offsets[-1] + len(record))
+
+    ids = [post['id'] for post in posts]
+    id_order = sorted(positions, key=ids.__getitem__)
+    timestamps = [sort_timestamp(post['sort_date']) for post in posts]
+    date_order = sorted(positions, key=timestamps.__getitem__)
+
+    sections = {
+        'record_offsets': array('Q', record_offsets).tobytes(),
+        'records': b''.join(records),
+        'sorted_ids': array('q', [ids[position] for position in id_order]).tobytes(),
+        'id_order': array('I', id_order).tobytes(),
+        'timestamps': array('q', timestamps).tobytes(),
+        'sorted_timestamps': array('q', sorted(timestamps)).tobytes(),
+        'date_order': array('I', date_order).tobytes(),
+        'changes': _changes_section(changes),
+    }
+    for field in SORTABLE_TEXT_FIELDS:
+        # The legacy ordering: the lowered first letter, then the raw value
+        keys = [(sort_initial(post[field]), post[field]) for post in posts]
+        sections[f'rank_{field}'] = array('I', _dense_ranks(keys)).tobytes()
+    for field in NORMALIZED_FIELDS:
+        # b'\x00' separates the values, so it must not occur inside them
+        values = [normalize_text(post[field], fold_accents).replace('\x00', '\ufffd')
+                  .encode('utf-8') for post in posts]
+        sections[f'text_{field}'], sections[f'text_{field}_offsets'] = _text_section(values)
+        if field == 'author':
+            sections['author_order'] = array('I', sorted(positions,
+                                                         key=values.__getitem__)).tobytes()
+
+    _publish(path, sections, version, count, fold_accents)
+
+
+def patch_snapshot(path, snapshot, position, post, version, changes=()):
+    """
+    Atomically publishes a new snapshot version in which a single post has been replaced,
+    copying every column but the records from the given version instead of rebuilding it.
+
+    :param path: (str) The path of the snapshot file.
+    :param snapshot: (PostSnapshot) The snapshot version to patch.
+    :param position: (int) The position of the replaced post.
+    :param post: (dict) The new post, whose INDEXED_FIELDS must be those of the old one.
+    :param version: (int) The version number of the new snapshot.
+    :param changes: (list) The latest (version, change event) pairs, oldest first; only the
+                    last SNAPSHOT_CHANGES are kept.
+    """
+    previous = snapshot[position]
+    if any(previous.get(field) != post.get(field) for field in INDEXED_FIELDS):
+        raise ValueError('Only the fields outside INDEXED_FIELDS can be patched.')
+
+    sections = {name: snapshot._section_bytes(name) for name, _ in _SECTIONS}
+    record = encode_post(post)
+    record_offsets = array('Q', sections['record_offsets'])
+    start, end = record_offsets[position], record_offsets[position + 1]
+    sections['records'] = b''.join((sections['records'][:start], record,
+                                    sections['records'][end:]))
+    growth = len(record) - (end - start)
+    for index in range(position + 1, len(record_offsets)):
+        record_offsets[index] += growth
+    sections['record_offsets'] = record_offsets.tobytes()
+    sections['changes'] = _changes_section(changes)
+
+    _publish(path, sections, version, len(snapshot), snapshot.fold_accents)
+
+
+class PostSnapshot:
+    """
+    A read-only sequence of blog posts backed by a memory-mapped snapshot file.
+
+    The columns are read straight from the shared mapping, and a post is only decoded
+    when it is accessed, so every process shares the same physical pages instead of
+    holding its own copy of the posts. Searching, sorting and filtering run on the
+    packed columns and return post positions, like the PostTable of the JSON mode.
+
+    An instance always stands for one snapshot version and never changes afterwards,
+    so iterating, slicing or indexing it is safe while a newer version is published.
+    Call latest() to get the instance of the newest version.
+
+    Attributes:
+    - _path (str): The path of the snapshot file.
+    - _map (mmap.mmap): The read-only mapping of this snapshot version.
+    - _identity (tuple): The inode and modification time of the mapped file.
+    - _columns (dict): A memoryview of every section, keyed by section name.
+    - _sections (dict): The offset and length of every section, keyed by section name.
+    - version (int): The version number of the mapped snapshot.
+    - fold_accents (bool): Whether the searchable text ignores accents as well as case.
+
+    Methods:
+    - latest(self): Returns the instance of the newest published snapshot version.
+    - to_list(self): Decodes every post into a new list.
+    - records(self): Returns the encoded record of every post, without decoding them.
+    - index_of(self, post_id): Returns the position of a blog post.
+    - search(self, field, needle, positions=None): Returns the positions of the matching posts.
+    - sort(self, positions, field, reverse=False): Sorts post positions by a field.
+    - between(self, date_from=None, date_to=None): Filters the posts by date range.
+    - by_author(self, author): Filters the posts by author.
+    - warm_up(self): Loads every page of the mapping ahead of the first queries.
+    - recent_changes(self): Returns the latest change events kept in the snapshot.
+    - changes_since(self, version): Returns the change events published after a version.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes the PostSnapshot instance and maps the current snapshot version.
+
+        :param path: (str) The path of the snapshot file.
+        """
+        try:
+            with open(path, 'rb') as file:
+                stat = os.fstat(file.fileno())
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError) as error:
+            raise SnapshotError(f"Cannot map the posts snapshot '{path}'.") from error
+
+        if len(mapped) < _HEADER.size:
+            raise SnapshotError()
+        magic, file_format, flags, section_count, version, count = _HEADER.unpack_from(mapped)
+        if (magic != SNAPSHOT_MAGIC or file_format != SNAPSHOT_FORMAT
+                or section_count != len(_SECTIONS)
+                or len(mapped) < _HEADER.size + section_count * _SECTION.size):
+            raise SnapshotError()
+
+        view = memoryview(mapped)
+        self._sections = {}
+        self._columns = {}
+        for index, (name, type_code) in enumerate(_SECTIONS):
+            offset, length = _SECTION.unpack_from(mapped, _HEADER.size + index * _SECTION.size)
+            if offset + length > len(mapped):
+                raise SnapshotError()
+            self._sections[name] = (offset, length)
+            column = view[offset:offset + length]
+            self._columns[name] = column.cast(type_code) if type_code else column
+
+        self._path = path
+        self._map = mapped
+        self._identity = (stat.st_ino, stat.st_mtime_ns)
+        self._count = count
+        self.version = version
+        self.fold_accents = bool(flags & FLAG_FOLD_ACCENTS)
+
+    def latest(self):
+        """
+        Returns the instance of the newest published snapshot version.
+
+        Readers still holding this instance keep using this version; the mapping is
+        released once no reader references it anymore.
+
+        :return: (PostSnapshot) A new instance if a newer version has been published,
+                 otherwise this instance.
+        """
+        try:
+            stat = os.stat(self._path)
+        except FileNotFoundError:
+            return self
+        if (stat.st_ino, stat.st_mtime_ns) == self._identity:
+            return self
+        try:
+            return PostSnapshot(self._path)
+        except SnapshotError:
+            return self
+
+    def _decode(self, index):
+        """
+        Decodes the post stored at the given index.
+
+        :param index: (int) The non-negative index of the post.
+
+        :return: (dict) The decoded blog post.
+        """
+        offsets = self._columns['record_offsets']
+        base, _ = self._sections['records']
+        return json.loads(self._map[base + offsets[index]:base + offsets[index + 1]])
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('snapshot index out of range')
+        return self._decode(index)
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self._decode(index)
+
+    def to_list(self):
+        """
+        Decodes every post into a new list.
+
+        :return: (list) The blog posts of the mapped snapshot.
+        """
+        return list(self)
+
+    def records(self):
+        """
+        Returns the encoded record of every post, without decoding them.
+
+        :return: (generator) The posts as encoded by encode_post(), in their stored order.
+        """
+        offsets = self._columns['record_offsets']
+        base, _ = self._sections['records']
+        for index in range(self._count):
+            yield self._map[base + offsets[index]:base + offsets[index + 1]]
+
+    def _section_bytes(self, name):
+        """
+        Copies a section of the mapping.
+
+        :param name: (str) The name of the section, one of _SECTIONS.
+
+        :return: (bytes) The content of the section.
+        """
+        offset, length = self._sections[name]
+        return self._map[offset:offset + length]
+
+    def index_of(self, post_id):
+        """
+        Returns the position of a blog post, using the sorted IDs.
+
+        :param post_id: (int) The ID of the blog post.
+
+        :return: (int) The position of the blog post, or -1 if it does not exist.
+        """
+        sorted_ids = self._columns['sorted_ids']
+        index = bisect_left(sorted_ids, post_id)
+        if index < self._count and sorted_ids[index] == post_id:
+            return self._columns['id_order'][index]
+        return -1
+
+    def search(self, field, needle, positions=None):
+        """
+        Returns the positions of the blog posts whose normalized field contains a text.
+
+        The packed text column is scanned with mmap.find(), so no value is decoded or
+        copied.
+
+        :param field: (str) One of NORMALIZED_FIELDS.
+        :param needle: (str) The normalized text to look for.
+        :param positions: (list) The positions of the candidate posts, or None for all.
+
+        :return: (list) The positions of the matching blog posts, in the given order.
+        """
+        if not needle:
+            return list(range(self._count) if positions is None else positions)
+        if '\x00' in needle:
+            # The values never contain the separator
+            return []
+
+        encoded = needle.encode('utf-8')
+        base, length = self._sections[f'text_{field}']
+        offsets = self._columns[f'text_{field}_offsets']
+        find = self._map.find
+
+        if positions is not None:
+            return [position for position in positions
+                    if find(encoded, base + offsets[position],
+                            base + offsets[position + 1] - 1) != -1]
+
+        # Jump from one match to the next value, so every post is reported once. The matches
+        # come in order, so each lookup only bisects the offsets after the previous one.
+        matches = []
+        position = 0
+        end = base + length
+        found = find(encoded, base, end)
+        while found != -1:
+            position = bisect_right(offsets, found - base, position) - 1
+            matches.append(position)
+            found = find(encoded, base + offsets[position + 1], end)
+        return matches
+
+    def sort(self, positions, field, reverse=False):
+        """
+        Sorts post positions by a field, using the packed timestamps or sort ranks.
+
+        :param positions: (list) The positions of the blog posts to sort, or None for all.
+        :param field: (str) 'date', or one of SORTABLE_TEXT_FIELDS.
+        :param reverse: (bool) Whether to sort in descending order.
+
+        :return: (list) The sorted positions.
+        """
+        if positions is None:
+            positions = range(self._count)
+        column = self._columns['timestamps' if field == 'date' else f'rank_{field}']
+        return sorted(positions, key=column.__getitem__, reverse=reverse)
+
+    def between(self, date_from=None, date_to=None):
+        """
+        Returns the positions of the blog posts created within a date range.
+
+        :param date_from: (date) The first day of the range, or None for no lower bound.
+        :param date_to: (date) The last day of the range (inclusive), or None for no upper bound.
+
+        :return: (list) The positions of the matching blog posts.
+        """
+        timestamps = self._columns['sorted_timestamps']
+        start = 0
+        end = self._count
+        if date_from is not None:
+            start = bisect_left(timestamps, day_timestamp(date_from))
+        if date_to is not None:
+            end = bisect_left(timestamps, day_timestamp(date_to + timedelta(days=1)))
+        return self._columns['date_order'][start:end].tolist()
+
+    def by_author(self, author):
+        """
+        Returns the positions of the blog posts of an author, using a binary search over
+        the posts ordered by normalized author.
+
+        :param author: (str) The normalized author name.
+
+        :return: (list) The positions of the matching blog posts.
+        """
+        encoded = author.encode('utf-8')
+        order = self._columns['author_order']
+        base, _ = self._sections['text_author']
+        offsets = self._columns['text_author_offsets']
+
+        def author_at(index):
+            position = order[index]
+            return self._map[base + offsets[position]:base + offsets[position + 1] - 1]
+
+        start, end = 0, self._count
+        while start < end:
+            middle = (start + end) // 2
+            if author_at(middle) < encoded:
+                start = middle + 1
+            else:
+                end = middle
+        stop = start
+        while stop < self._count and author_at(stop) == encoded:
+            stop += 1
+        return order[start:stop].tolist()
+
+    def warm_up(self):
+        """
+        Loads every page of the mapping ahead of the first queries.
+
+        :return: (int) A checksum of the bytes read, only there so the reads are kept.
+        """
+        if hasattr(self._map, 'madvise') and hasattr(mmap, 'MADV_WILLNEED'):
+            self._map.madvise(mmap.MADV_WILLNEED)
+        # Reading one byte of every page maps it into this process as well
+        checksum = 0
+        for offset in range(0, len(self._map), mmap.PAGESIZE):
+            checksum ^= self._map[offset]
+        return checksum
+
+    def recent_changes(self):
+        """
+        Returns the latest change events kept in the snapshot.
+
+        :return: (list) The (version, change event) pairs, oldest first.
+        """
+        base, length = self._sections['changes']
+        return [tuple(change) for change in json.loads(self._map[base:base + length])]
+
+    def changes_since(self, version):
+        """
+        Returns the change events published after a snapshot version, up to this one.
+
+        :param version: (int) The last snapshot version already seen.
+
+        :return: (list) The change events, oldest first, or None if some of the versions in
+                 between are not described by a kept change event.
+        """
+        changes = [change for change_version, change in self.recent_changes()
+                   if change_version > version]
+        if len(changes) != self.version - version:
+            return None
+        return changes
+
+
+class SnapshotWriteLock:
+    """
+    An inter-process lock making sure only one process publishes a snapshot at a time.
+
+    Usage:
+        with SnapshotWriteLock(lock_path):
+            ...
+    """
+
+    def __init__(self, path):
+        """
+        Initializes the SnapshotWriteLock instance.
+
+        :param path: (str) The path of the lock file.
+        """
+        self._path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self._path, 'a+b')
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
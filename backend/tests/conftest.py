@@ -0,0 +1,34 @@
+import json
+import os
+import sys
+
+import pytest
+
+# The backend modules import each other as top-level packages ('database', ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.data_handler import DataHandler  # noqa: E402
+
+SAMPLE_POSTS = [{'id': post_id, 'date': f'Mon, Jan {post_id:02d}, 2024', 'author': author,
+                 'title': f'Title {post_id}', 'content': f'Content {post_id}',
+                 'sort_date': f'Mon, Jan {post_id:02d}, 2024 12:00:00'}
+                for post_id, author in enumerate(['Ann', 'Bob', 'ann', 'Cleo', 'Dan'], start=1)]
+
+
+@pytest.fixture
+def make_handler(tmp_path, monkeypatch):
+    """
+    Returns a factory building DataHandler instances on the SAMPLE_POSTS database.
+
+    The factory takes the keyword arguments of DataHandler, e.g. shared_snapshot=True. All
+    the instances share the same files, like the worker processes of one deployment.
+    """
+    (tmp_path / 'database').mkdir()
+    (tmp_path / 'database' / 'posts.json').write_text(json.dumps(SAMPLE_POSTS),
+                                                      encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+
+    def make(**options):
+        return DataHandler('posts.json', **options)
+
+    return make
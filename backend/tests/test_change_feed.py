@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from database.data_handler import ChangeFeed, ChangeSubscriber, change_event, server_sent_events
+
+
+def test_overflow_leaves_a_single_resync_event():
+    subscriber = ChangeSubscriber(max_pending=3)
+    for post_id in range(1, 5):
+        subscriber.push(change_event('liked', post_id, {'likes': 1}))
+
+    assert subscriber.next_event(timeout=0) == {'type': 'resync'}
+    assert subscriber.next_event(timeout=0) is None
+
+
+def test_publish_reaches_every_subscriber_but_the_unsubscribed_ones():
+    feed = ChangeFeed()
+    first, second, leaving = feed.subscribe(), feed.subscribe(), feed.subscribe()
+    feed.unsubscribe(leaving)
+
+    event = change_event('deleted', 7, total_posts=3)
+    feed.publish(event)
+
+    assert first.next_event(timeout=0) == event
+    assert second.next_event(timeout=0) == event
+    assert leaving.next_event(timeout=0) is None
+
+
+@pytest.mark.parametrize('shared_snapshot', [False, True])
+def test_update_without_changes_publishes_nothing(make_handler, shared_snapshot):
+    handler = make_handler(shared_snapshot=shared_snapshot)
+    subscriber = handler.subscribe()
+
+    updated = handler.update_post(2, {'title': 'Title 2', 'author': 'Bob'})
+    assert updated['title'] == 'Title 2'
+    assert handler.update_post(2, {'title': 'Changed'})['title'] == 'Changed'
+
+    # The watcher of the shared mode relays the changes within SNAPSHOT_POLL_SECONDS
+    assert subscriber.next_event(timeout=5) == {'type': 'updated', 'id': 2,
+                                                'fields': {'title': 'Changed'}}
+    handler.unsubscribe(subscriber)
+
+
+def test_server_sent_events_framing():
+    subscriber = ChangeSubscriber()
+    event = change_event('created', 4, {'id': 4, 'title': 'New'}, 4)
+    subscriber.push(event)
+    stream = server_sent_events(subscriber, keep_alive_seconds=0)
+
+    assert next(stream) == 'retry: 3000\n\n'
+    message = next(stream)
+    assert message == f"event: created\ndata: {json.dumps(event)}\n\n"
+    assert json.loads(message.split('\n')[1][len('data: '):]) == event
+    assert next(stream) == ': keep-alive\n\n'
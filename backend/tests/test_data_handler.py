@@ -0,0 +1,48 @@
+from datetime import date
+
+import pytest
+
+from conftest import SAMPLE_POSTS
+from database.data_handler import PostIndexes, PostTable
+
+NO_FILTERS = {'author': '', 'date_from': None, 'date_to': None}
+
+
+@pytest.mark.parametrize('sort_by', ['', 'title'])
+def test_unfiltered_listing_does_not_build_the_indexes(make_handler, monkeypatch, sort_by):
+    json_handler = make_handler()
+    json_handler.increase_post_likes(1)
+
+    def fail(indexes, shadows):
+        raise AssertionError('the indexes must not be built without a filter')
+
+    monkeypatch.setattr(PostIndexes, '__init__', fail)
+    page = json_handler.get_posts(sort_by, 'asc', 1, 10, NO_FILTERS)
+
+    assert [post['id'] for post in page['posts']] == [1, 2, 3, 4, 5]
+    assert page['totalPosts'] == 5
+    assert json_handler.filter_posts(**NO_FILTERS) is None
+
+
+def test_filters_are_combined(make_handler):
+    page = make_handler().get_posts('', 'asc', 1, 10, {'author': 'ANN',
+                                                       'date_from': date(2024, 1, 2),
+                                                       'date_to': None})
+    assert [post['id'] for post in page['posts']] == [3]
+    assert page['totalPosts'] == 1
+
+
+class CollidingTitle(str):
+    """A title whose hash collides with every other one."""
+
+    def __hash__(self):
+        return 0
+
+
+def test_shadows_are_only_reused_for_equal_posts():
+    previous = PostTable([dict(SAMPLE_POSTS[0], title=CollidingTitle('Apple'))])
+    table = PostTable([dict(SAMPLE_POSTS[0], title=CollidingTitle('Banana'))],
+                      previous=previous)
+
+    assert table.search('title', 'banana') == [0]
+    assert table.search('title', 'apple') == []
@@ -0,0 +1,153 @@
+import json
+import threading
+from datetime import date
+
+import pytest
+
+from conftest import SAMPLE_POSTS
+from database.data_handler import DataHandler, PostTable
+from database.snapshot import PostSnapshot, patch_snapshot, write_snapshot
+
+
+def test_reader_keeps_its_snapshot_version_while_a_post_is_deleted(make_handler):
+    shared_handler = make_handler(shared_snapshot=True)
+    posts = iter(shared_handler._posts)
+    assert next(posts)['id'] == 1
+    assert next(posts)['id'] == 2
+
+    # Publishing the next version must not remap the version being iterated
+    assert shared_handler.delete_post(1)
+    assert [post['id'] for post in posts] == [3, 4, 5]
+
+    assert [post['id'] for post in shared_handler._posts] == [2, 3, 4, 5]
+
+
+def test_readers_never_disturb_a_concurrent_writer(make_handler):
+    shared_handler = make_handler(shared_snapshot=True)
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        while not stop.is_set():
+            try:
+                assert shared_handler.get_posts('', 'asc', 1, 10)['totalPosts'] == 5
+            except Exception as error:
+                errors.append(error)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    try:
+        liked = [shared_handler.increase_post_likes(3) for _ in range(40)]
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+    assert all(liked) and not errors
+    with open('database/posts.json', encoding='utf-8') as file:
+        assert json.load(file)[2]['likes'] == 40
+    assert shared_handler.fetch_post_by_id(3)[0]['likes'] == 40
+
+
+def test_snapshot_queries_match_the_json_table(tmp_path):
+    posts = [{'id': post_id, 'date': f'Mon, Jan {day:02d}, 2024', 'author': author,
+              'title': title, 'content': title * 2,
+              'sort_date': f'Mon, Jan {day:02d}, 2024 10:00:00'}
+             for post_id, (day, author, title) in enumerate([
+                 (3, 'Ann', 'banana'), (1, 'ann', 'Apple'), (2, 'Bob', 'apple'),
+                 (3, 'Émile', 'Éclair'), (1, 'Bob', 'apple')], start=1)]
+    write_snapshot(str(tmp_path / 'posts.snapshot'), posts, 1)
+    snapshot = PostSnapshot(str(tmp_path / 'posts.snapshot'))
+    table = PostTable(posts)
+
+    assert snapshot.to_list() == posts
+    for field in ('title', 'author', 'content', 'date'):
+        for reverse in (False, True):
+            assert snapshot.sort(range(5), field, reverse) == table.sort(range(5), field, reverse)
+            assert snapshot.sort(None, field, reverse) == table.sort(None, field, reverse)
+        for needle in ('', 'a', 'pp', 'é', 'jan 03'):
+            assert snapshot.search(field, needle) == table.search(field, needle)
+            assert snapshot.search(field, needle, [0, 2, 4]) == table.search(field, needle,
+                                                                               [0, 2, 4])
+    assert snapshot.by_author('ann') == table.by_author('ann') == [0, 1]
+    assert sorted(snapshot.between(date(2024, 1, 2), date(2024, 1, 3))) == [0, 2, 3]
+    assert sorted(table.between(date(2024, 1, 2), date(2024, 1, 3))) == [0, 2, 3]
+    assert snapshot.index_of(4) == table.index_of(4) == 3
+    assert snapshot.index_of(9) == -1
+
+
+def test_patching_a_post_keeps_the_other_columns(tmp_path):
+    path = str(tmp_path / 'posts.snapshot')
+    posts = [{'id': post_id, 'date': 'Mon, Jan 01, 2024', 'author': f'Author {post_id}',
+              'title': title, 'content': title, 'sort_date': 'Mon, Jan 01, 2024 12:00:00'}
+             for post_id, title in enumerate(['b', 'c', 'a'], start=1)]
+    write_snapshot(path, posts, 1)
+    snapshot = PostSnapshot(path)
+
+    liked = dict(posts[1], likes=12)
+    patch_snapshot(path, snapshot, 1, liked, 2, [(2, {'type': 'liked', 'id': 2})])
+    patched = snapshot.latest()
+
+    assert patched.version == 2 and patched.to_list() == [posts[0], liked, posts[2]]
+    assert b''.join(patched.records()).count(b'"likes":12') == 1
+    assert patched.sort(None, 'title') == [2, 0, 1]
+    assert patched.search('title', 'c') == [1] and patched.index_of(3) == 2
+    assert patched.changes_since(1) == [{'type': 'liked', 'id': 2}]
+    with pytest.raises(ValueError):
+        patch_snapshot(path, patched, 1, dict(liked, title='d'), 3)
+
+
+def test_changes_of_another_worker_reach_the_subscribers(make_handler):
+    shared_handler = make_handler(shared_snapshot=True)
+    # A second handler on the same files stands for another worker process
+    other_worker = make_handler(shared_snapshot=True)
+    subscriber = shared_handler.subscribe()
+
+    assert other_worker.increase_post_likes(3)
+    assert other_worker.delete_post(4)
+
+    assert subscriber.next_event(timeout=5) == {'type': 'liked', 'id': 3,
+                                                'fields': {'likes': 1}}
+    assert subscriber.next_event(timeout=5) == {'type': 'deleted', 'id': 4, 'totalPosts': 4}
+    shared_handler.unsubscribe(subscriber)
+
+
+def test_lazy_load_builds_a_missing_snapshot_in_the_background(make_handler, tmp_path,
+                                                               monkeypatch):
+    parsing = threading.Event()
+    is_valid_json_file = DataHandler.is_valid_json_file
+
+    def slow_is_valid_json_file(handler):
+        assert parsing.wait(timeout=5)
+        return is_valid_json_file(handler)
+
+    monkeypatch.setattr(DataHandler, 'is_valid_json_file', slow_is_valid_json_file)
+    lazy_handler = make_handler(lazy_load=True)
+
+    # The instance is returned before the JSON file has even been parsed
+    assert not lazy_handler.ready.is_set()
+    parsing.set()
+    assert lazy_handler.ready.wait(timeout=5)
+    assert lazy_handler.get_posts('', 'asc', 1, 10) == {'posts': SAMPLE_POSTS, 'totalPosts': 5}
+    assert (tmp_path / 'database' / 'posts.snapshot').exists()
+    assert lazy_handler.hydrated.wait(timeout=5)
+
+
+def test_lazy_hydration_completes_despite_a_failed_attempt(make_handler, monkeypatch):
+    make_handler(shared_snapshot=True)
+    warm_up = PostSnapshot.warm_up
+    failures = []
+
+    def flaky_warm_up(snapshot):
+        if not failures:
+            failures.append(snapshot.version)
+            raise ValueError('snapshot replaced while warming up')
+        return warm_up(snapshot)
+
+    monkeypatch.setattr(PostSnapshot, 'warm_up', flaky_warm_up)
+    lazy_handler = make_handler(lazy_load=True)
+    assert lazy_handler.delete_post(2)
+
+    assert lazy_handler.hydrated.wait(timeout=5)
+    assert failures and lazy_handler.hydration_seconds is not None
@@ -10,6 +10,10 @@ const LIST_POST_COMMAND = 4;
 const SEARCH_COMMAND = 5
 const SORT_COMMAND = 6;
 
+// The search endpoint allows 20 requests per minute, so the change feed reloads search
+// results at most once every 5 seconds, leaving room for the user's own searches
+const FEED_SEARCH_RELOAD_INTERVAL = 5000;
+
 // Global variables
 let defaultPageSize = 10;
 let isAscendingOrder = true;
@@ -18,6 +22,11 @@ let inSearchMode = false;
 let pageNumber = 1;
 let tempPage = pageNumber;
 let lastCommand = NULL_COMMAND;
+let changeFeed = null;
+let displayedPosts = new Map();
+let displayedTotalPosts = 0;
+let feedReloadTimer = null;
+let lastSearchLoad = 0;
 
 // -----------------------------------------------------------------------------
 // Window Load Event
@@ -381,6 +390,9 @@ function sendFetchRequest(page_number = 1) {
     var baseUrl = document.getElementById('api-base-url').value;
     localStorage.setItem('apiBaseUrl', baseUrl);
 
+    // Make sure we are listening to the change feed of this API
+    connectChangeFeed(baseUrl);
+
     // Construct the URL for the API request
     var endpointUrl = baseUrl + '/posts';
 
@@ -443,6 +455,14 @@ function sendFetchRequest(page_number = 1) {
 function loadPosts(page_number=1) {
     console.log("page number =", page_number);
 
+    // This request brings every pending change of the feed along
+    if (feedReloadTimer !== null) {
+        clearTimeout(feedReloadTimer);
+        feedReloadTimer = null;
+    }
+    if (inSearchMode)
+        lastSearchLoad = Date.now();
+
     sendFetchRequest(page_number)
         .then(data => {
             // Check if page_number is greater than 1 and data.posts is not an empty list
@@ -491,6 +511,11 @@ function displayPosts(data, page_index = 1) {
     const posts = data.posts;
     const totalPosts = data.totalPosts;
 
+    // Remember what is on screen so change feed events can patch it in place
+    displayedTotalPosts = totalPosts;
+    displayedPosts.clear();
+    posts.forEach(post => displayedPosts.set(post.id, post));
+
     // Create pagination based on totalPosts and current page index
     renderPaginationButtons(totalPosts, page_index);
 
@@ -509,6 +534,7 @@ function displayPosts(data, page_index = 1) {
 
     // Create the ul element
     const ulElement = document.createElement("ul")
+    ulElement.id = "posts-list";
 
     if (totalPosts === 0) {
         // Display a message if there are no posts
@@ -524,72 +550,7 @@ function displayPosts(data, page_index = 1) {
         // Render the posts
         // For each post in the response, create a new post element and add it to the page
         posts.forEach(post => {
-            // code to create and append post elements
-            const liElement = document.createElement("li")
-            liElement.className = "blog-post"
-
-            const postHeader = document.createElement("div");
-            postHeader.className = "blog-post-header";
-
-            const postDate = document.createElement("p");
-            postDate.className = "date";
-            postDate.innerHTML = `<strong>Date:</strong> ${post.date}`;
-            liElement.appendChild(postDate);
-
-            const postTitle = document.createElement("h2");
-            postTitle.textContent = post.title;
-            postHeader.appendChild(postTitle);
-
-            const postActions = document.createElement("div");
-            postActions.className = "blog-post-actions";
-
-            const updateButton = document.createElement("button");
-            updateButton.className = "update-button";
-            updateButton.textContent = "Update";
-            updateButton.onclick = () => displayUpdatePostDialog(post);
-
-            const deleteButton = document.createElement("button");
-            deleteButton.className = "delete-button";
-            deleteButton.textContent = "Delete";
-            deleteButton.onclick = () => deletePost(post.id, post.title);
-
-            postActions.appendChild(updateButton);
-            postActions.appendChild(deleteButton);
-            postHeader.appendChild(postActions);
-            liElement.appendChild(postHeader);
-
-            const authorName = document.createElement("p");
-            authorName.className = "author";
-            authorName.innerHTML = `<strong>Author:</strong> ${post.author}`;
-            liElement.appendChild(authorName);
-
-            const contentParagraph = document.createElement("p");
-            contentParagraph.className = "post-content"
-            contentParagraph.innerHTML = post.content;
-            liElement.appendChild(contentParagraph);
-
-            const postFooter = document.createElement("div");
-            postFooter.className = "blog-post-footer";
-
-            const likeButton = document.createElement("button");
-            likeButton.className = "like-button";
-
-            const thumbsUpIcon = document.createElement("i");
-            thumbsUpIcon.className = "far fa-thumbs-up";
-            thumbsUpIcon.style.color = "#007bff";
-
-            const likeCountSpan = document.createElement("span");
-            likeCountSpan.className = "like-count";
-            likeCountSpan.id = 'like-count-${post.id}';
-            likeCountSpan.textContent = post.likes;
-
-            likeButton.appendChild(thumbsUpIcon);
-            likeButton.appendChild(likeCountSpan);
-            likeButton.onclick = () => likePost(post.id);
-
-            postFooter.appendChild(likeButton);
-            liElement.appendChild(postFooter);
-            ulElement.appendChild(liElement);
+            ulElement.appendChild(createPostElement(post));
         });
 
         // Add the posts list to the container.
@@ -597,6 +558,81 @@ function displayPosts(data, page_index = 1) {
     }
 }
 
+/**
+ * Creates the list item element that renders a single blog post.
+ *
+ * @param {object} post - The post object to render.
+ * @returns {HTMLElement} - The 'li' element representing the post.
+ */
+function createPostElement(post) {
+    const liElement = document.createElement("li")
+    liElement.className = "blog-post"
+    liElement.id = `post-${post.id}`;
+
+    const postHeader = document.createElement("div");
+    postHeader.className = "blog-post-header";
+
+    const postDate = document.createElement("p");
+    postDate.className = "date";
+    postDate.innerHTML = `<strong>Date:</strong> ${post.date}`;
+    liElement.appendChild(postDate);
+
+    const postTitle = document.createElement("h2");
+    postTitle.textContent = post.title;
+    postHeader.appendChild(postTitle);
+
+    const postActions = document.createElement("div");
+    postActions.className = "blog-post-actions";
+
+    const updateButton = document.createElement("button");
+    updateButton.className = "update-button";
+    updateButton.textContent = "Update";
+    updateButton.onclick = () => displayUpdatePostDialog(post);
+
+    const deleteButton = document.createElement("button");
+    deleteButton.className = "delete-button";
+    deleteButton.textContent = "Delete";
+    deleteButton.onclick = () => deletePost(post.id, post.title);
+
+    postActions.appendChild(updateButton);
+    postActions.appendChild(deleteButton);
+    postHeader.appendChild(postActions);
+    liElement.appendChild(postHeader);
+
+    const authorName = document.createElement("p");
+    authorName.className = "author";
+    authorName.innerHTML = `<strong>Author:</strong> ${post.author}`;
+    liElement.appendChild(authorName);
+
+    const contentParagraph = document.createElement("p");
+    contentParagraph.className = "post-content"
+    contentParagraph.innerHTML = post.content;
+    liElement.appendChild(contentParagraph);
+
+    const postFooter = document.createElement("div");
+    postFooter.className = "blog-post-footer";
+
+    const likeButton = document.createElement("button");
+    likeButton.className = "like-button";
+
+    const thumbsUpIcon = document.createElement("i");
+    thumbsUpIcon.className = "far fa-thumbs-up";
+    thumbsUpIcon.style.color = "#007bff";
+
+    const likeCountSpan = document.createElement("span");
+    likeCountSpan.className = "like-count";
+    likeCountSpan.id = `like-count-${post.id}`;
+    likeCountSpan.textContent = post.likes;
+
+    likeButton.appendChild(thumbsUpIcon);
+    likeButton.appendChild(likeCountSpan);
+    likeButton.onclick = () => likePost(post.id);
+
+    postFooter.appendChild(likeButton);
+    liElement.appendChild(postFooter);
+    return liElement;
+}
+
 /**
  * Creates or retrieves a pagination container and inserts it into the DOM,
  * allowing users to select the number of posts to display per page.
@@ -906,8 +942,10 @@ function addPost(event) {
         var text = "The post '<span style='color: red; font-weight: bold;'>" + post.title + "</span>' has been successfully added!";
         displayResult(text, true);
 
-        // Reload the posts after adding a new one
-        loadPosts(pageNumber);
+        // Reload the posts after adding a new one, unless the change feed will patch the page
+        if (!isChangeFeedLive()) {
+            loadPosts(pageNumber);
+        }
     })
     .catch(error => {
         console.error('Error:', error);  // If an error occurs, log it to the console
@@ -967,8 +1005,10 @@ function updatePost(event, post) {
         var text = "The post '<span style='color: red; font-weight: bold;'>" + post.title + "</span>' has been successfully updated!";
         displayResult(text, true);
 
-        // Reload the posts after updating a post
-        loadPosts(pageNumber);
+        // Reload the posts after updating a post, unless the change feed will patch the page
+        if (!isChangeFeedLive()) {
+            loadPosts(pageNumber);
+        }
     })
     .catch(error => {
         // Log and display error message if an error occurs
@@ -1005,10 +1045,13 @@ function deletePost(postId, postTitle) {
                 // Check if the response is successful
                 if (response.ok) {
                     console.log('Post deleted:', postId);
-                    lastCommand = DELETE_POST_COMMAND;
-                    // Display a success message and reload the posts after deleting a post
+                    // Display a success message and reload the posts after deleting a post,
+                    // unless the change feed will patch the page
                     displayResult('Post deleted successfully!', true);
-                    loadPosts(pageNumber);
+                    if (!isChangeFeedLive()) {
+                        lastCommand = DELETE_POST_COMMAND;
+                        loadPosts(pageNumber);
+                    }
                 } else {
                     // If the response is not ok, check different status codes
                     switch (response.status) {
@@ -1049,8 +1092,10 @@ function likePost(postId) {
         if (response.ok) {
             console.log('Post Liked:', postId);
 
-            // Reload the posts after liking a post
-            loadPosts(pageNumber);
+            // Reload the posts after liking a post, unless the change feed will patch the page
+            if (!isChangeFeedLive()) {
+                loadPosts(pageNumber);
+            }
         } else {
             // Log an error message if the response is not ok
             console.error('Error:', response.status, response.statusText);
@@ -1062,6 +1107,206 @@ function likePost(postId) {
     });
 }
 
+// -----------------------------------------------------------------------------
+// Change Feed Functions
+// -----------------------------------------------------------------------------
+// This section keeps the displayed page in sync with the '/posts/events'
+// Server-Sent Events stream, patching the DOM instead of reloading the page.
+//
+/**
+ * Opens the change feed of the given API, closing any feed of a previous API.
+ *
+ * @param {string} baseUrl - The API base URL.
+ */
+function connectChangeFeed(baseUrl) {
+    const feedUrl = baseUrl + '/posts/events';
+
+    // Nothing to do if we are already listening to this API
+    if (changeFeed && changeFeed.url.endsWith(feedUrl) && changeFeed.readyState !== EventSource.CLOSED)
+        return;
+
+    if (changeFeed)
+        changeFeed.close();
+
+    changeFeed = new EventSource(feedUrl);
+    changeFeed.addEventListener('created', event => handlePostCreated(JSON.parse(event.data)));
+    changeFeed.addEventListener('updated', event => handlePostUpdated(JSON.parse(event.data)));
+    changeFeed.addEventListener('deleted', event => handlePostDeleted(JSON.parse(event.data)));
+    changeFeed.addEventListener('liked', event => handlePostLiked(JSON.parse(event.data)));
+
+    // The server dropped events we were too slow to receive, start over from a fresh page
+    changeFeed.addEventListener('resync', () => scheduleFeedReload());
+
+    changeFeed.onerror = error => console.warn('Change feed error:', error);
+}
+
+/**
+ * Checks whether the change feed is connected and will deliver our own changes.
+ *
+ * @returns {boolean} - True if the change feed is open, false otherwise.
+ */
+function isChangeFeedLive() {
+    return changeFeed !== null && changeFeed.readyState === EventSource.OPEN;
+}
+
+/**
+ * Returns the page size currently selected in the page size menu.
+ *
+ * @returns {number} - The number of posts per page.
+ */
+function getSelectedPageSize() {
+    const pageSizeMenu = document.getElementById('page-size-menu');
+    return pageSizeMenu ? parseInt(pageSizeMenu.value) : defaultPageSize;
+}
+
+/**
+ * Reloads the current page after a change event.
+ * Search results are reloaded at most once every FEED_SEARCH_RELOAD_INTERVAL, so a burst
+ * of changes costs a single search request instead of hitting the rate limit; the events
+ * arriving meanwhile are covered by the pending reload.
+ */
+function scheduleFeedReload() {
+    if (!inSearchMode) {
+        loadPosts(pageNumber);
+        return;
+    }
+
+    if (feedReloadTimer !== null)
+        return;
+
+    const delay = Math.max(0, lastSearchLoad + FEED_SEARCH_RELOAD_INTERVAL - Date.now());
+    feedReloadTimer = setTimeout(() => {
+        feedReloadTimer = null;
+        loadPosts(pageNumber);
+    }, delay);
+}
+
+/**
+ * Handles a 'created' change event.
+ * Without sorting or searching, new posts go to the end of the list, so the post is
+ * appended when the last page has room; otherwise only the pagination is updated.
+ *
+ * @param {object} event - The change event carrying the new post in 'fields'.
+ */
+function handlePostCreated(event) {
+    // Sorted or filtered pages can't be placed locally, ask the server
+    if (inSortMode || inSearchMode) {
+        scheduleFeedReload();
+        return;
+    }
+
+    const pageSize = getSelectedPageSize();
+    const postsList = document.getElementById('posts-list');
+    const firstIndexOnPage = (pageNumber - 1) * pageSize;
+    const fitsOnPage = event.totalPosts - 1 < firstIndexOnPage + pageSize &&
+                       event.totalPosts - 1 >= firstIndexOnPage;
+
+    if (!postsList || !fitsOnPage) {
+        // The first post of the store or a post on another page
+        if (!postsList && event.totalPosts === 1)
+            loadPosts(pageNumber);
+        else
+            renderPaginationButtons(event.totalPosts, pageNumber);
+        displayedTotalPosts = event.totalPosts;
+        return;
+    }
+
+    const post = event.fields;
+    displayedPosts.set(post.id, post);
+    displayedTotalPosts = event.totalPosts;
+    postsList.appendChild(createPostElement(post));
+    renderPaginationButtons(displayedTotalPosts, pageNumber);
+}
+
+/**
+ * Handles an 'updated' change event by patching the displayed post in place.
+ *
+ * @param {object} event - The change event carrying the changed fields.
+ */
+function handlePostUpdated(event) {
+    const post = displayedPosts.get(event.id);
+
+    // A change of the searched or sorted field may move posts in or out of this page
+    const searchBy = document.getElementById('search-menu').value;
+    const sortBy = document.getElementById('sortMenu').value;
+    if ((inSearchMode && searchBy in event.fields) || (inSortMode && sortBy in event.fields)) {
+        scheduleFeedReload();
+        return;
+    }
+
+    const liElement = document.getElementById(`post-${event.id}`);
+    if (!post || !liElement)
+        return;
+
+    // The update and delete buttons hold on to this object, so keep it current
+    Object.assign(post, event.fields);
+
+    if ('title' in event.fields)
+        liElement.querySelector('h2').textContent = post.title;
+    if ('author' in event.fields)
+        liElement.querySelector('.author').innerHTML = `<strong>Author:</strong> ${post.author}`;
+    if ('content' in event.fields)
+        liElement.querySelector('.post-content').innerHTML = post.content;
+}
+
+/**
+ * Handles a 'deleted' change event by removing the post from the page.
+ * The page is only fetched again when a post from the next page has to move up,
+ * the current page became empty, or a post deleted elsewhere may shift the page.
+ *
+ * @param {object} event - The change event carrying the new total posts count.
+ */
+function handlePostDeleted(event) {
+    const liElement = document.getElementById(`post-${event.id}`);
+
+    if (!liElement) {
+        // Only the first page of the unsorted list provably keeps its posts: the deleted
+        // post comes after it. A post deleted from an earlier page shifts every later page,
+        // and sorted or searched pages can't tell where the post was.
+        if (pageNumber > 1 || inSortMode || inSearchMode) {
+            // Step back if the shift emptied the last page
+            lastCommand = DELETE_POST_COMMAND;
+            scheduleFeedReload();
+        } else {
+            displayedTotalPosts = event.totalPosts;
+            renderPaginationButtons(displayedTotalPosts, pageNumber);
+        }
+        return;
+    }
+
+    liElement.remove();
+    displayedPosts.delete(event.id);
+    displayedTotalPosts = inSearchMode ? displayedTotalPosts - 1 : event.totalPosts;
+
+    if (displayedPosts.size === 0 && pageNumber > 1) {
+        // The page became empty, move to the previous one
+        pageNumber = pageNumber - 1;
+        scheduleFeedReload();
+    } else if (displayedTotalPosts >= pageNumber * getSelectedPageSize()) {
+        // A post from the next page moves up to fill the gap
+        scheduleFeedReload();
+    } else if (displayedTotalPosts === 0) {
+        displayPosts({posts: [], totalPosts: 0}, pageNumber);
+    } else {
+        renderPaginationButtons(displayedTotalPosts, pageNumber);
+    }
+}
+
+/**
+ * Handles a 'liked' change event by updating the like count of the displayed post.
+ *
+ * @param {object} event - The change event carrying the new like count.
+ */
+function handlePostLiked(event) {
+    const post = displayedPosts.get(event.id);
+    const likeCountSpan = document.getElementById(`like-count-${event.id}`);
+    if (!post || !likeCountSpan)
+        return;
+
+    post.likes = event.fields.likes;
+    likeCountSpan.textContent = post.likes;
+}
+
 // -----------------------------------------------------------------------------
 // Sorting Functions
 // -----------------------------------------------------------------------------